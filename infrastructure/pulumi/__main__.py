@@ -30,15 +30,17 @@ apis = [
     "artifactregistry.googleapis.com",
 ]
 
-enabled_apis = []
+# Keyed by short API name so each resource depends only on the API it uses,
+# letting Pulumi create unrelated resources in parallel
+enabled_apis: dict[str, gcp.projects.Service] = {}
 for api in apis:
-    service = gcp.projects.Service(
-        f"enable-{api.split('.')[0]}",
+    name = api.split(".")[0]
+    enabled_apis[name] = gcp.projects.Service(
+        f"enable-{name}",
         service=api,
         project=project_id,
         disable_on_destroy=False,
     )
-    enabled_apis.append(service)
 
 # Create Artifact Registry repository for Portia images
 artifact_repo = gcp.artifactregistry.Repository(
@@ -47,7 +49,7 @@ artifact_repo = gcp.artifactregistry.Repository(
     format="DOCKER",
     location=region,
     project=project_id,
-    opts=pulumi.ResourceOptions(depends_on=enabled_apis),
+    opts=pulumi.ResourceOptions(depends_on=[enabled_apis["artifactregistry"]]),
 )
 
 
@@ -76,27 +78,73 @@ portia_roles = [
     "roles/cloudtrace.agent",
 ]
 
+# Non-authoritative per-role members: an IAMPolicy/IAMBinding would take over
+# the project policy (or whole roles) and drop grants managed elsewhere.
+# Account.member is already "serviceAccount:{email}", so no apply() is needed.
+portia_member = portia_sa.member
+
 for i, role in enumerate(portia_roles):
     gcp.projects.IAMMember(
         f"portia-iam-{i}",
         project=project_id,
         role=role,
-        member=portia_sa.email.apply(lambda e: f"serviceAccount:{e}"),
+        member=portia_member,
     )
 
+
+def _lifecycle_rules(
+    delete_after_days: int,
+    prefix: str | None = None,
+    nearline_after_days: int | None = None,
+) -> list[gcp.storage.BucketLifecycleRuleArgs]:
+    """Age-based delete, optionally scoped to the prefix the app writes under.
+
+    Without a prefix every object in the bucket is deleted. Optionally moves
+    objects to NEARLINE first, and aborts incomplete multipart uploads after a
+    day so stuck uploads do not accumulate storage.
+    """
+    matches_prefixes = [prefix] if prefix is not None else None
+    rules = [
+        gcp.storage.BucketLifecycleRuleArgs(
+            action=gcp.storage.BucketLifecycleRuleActionArgs(type="Delete"),
+            condition=gcp.storage.BucketLifecycleRuleConditionArgs(
+                age=delete_after_days,
+                matches_prefixes=matches_prefixes,
+            ),
+        ),
+        gcp.storage.BucketLifecycleRuleArgs(
+            action=gcp.storage.BucketLifecycleRuleActionArgs(
+                type="AbortIncompleteMultipartUpload"
+            ),
+            condition=gcp.storage.BucketLifecycleRuleConditionArgs(age=1),
+        ),
+    ]
+    if nearline_after_days is not None:
+        rules.append(
+            gcp.storage.BucketLifecycleRuleArgs(
+                action=gcp.storage.BucketLifecycleRuleActionArgs(
+                    type="SetStorageClass", storage_class="NEARLINE"
+                ),
+                condition=gcp.storage.BucketLifecycleRuleConditionArgs(
+                    age=nearline_after_days,
+                    matches_prefixes=matches_prefixes,
+                    matches_storage_classes=["STANDARD"],
+                ),
+            )
+        )
+    return rules
+
+
 # Create GCS buckets
 temp_bucket = gcp.storage.Bucket(
     "portia-temp",
     name=f"{project_id}-portia-temp",
     location=region,
     uniform_bucket_level_access=True,
-    lifecycle_rules=[
-        gcp.storage.BucketLifecycleRuleArgs(
-            action=gcp.storage.BucketLifecycleRuleActionArgs(type="Delete"),
-            condition=gcp.storage.BucketLifecycleRuleConditionArgs(age=1),
-        )
-    ],
-    opts=pulumi.ResourceOptions(depends_on=enabled_apis),
+    # Holds patient data (PHI): every object is deleted after a day, whatever
+    # key it was written under
+    lifecycle_rules=_lifecycle_rules(delete_after_days=1),
+    opts=pulumi.ResourceOptions(depends_on=[enabled_apis["storage"]]),
 )
 
 exports_bucket = gcp.storage.Bucket(
@@ -104,13 +152,13 @@ exports_bucket = gcp.storage.Bucket(
     name=f"{project_id}-portia-exports",
     location=region,
     uniform_bucket_level_access=True,
-    lifecycle_rules=[
-        gcp.storage.BucketLifecycleRuleArgs(
-            action=gcp.storage.BucketLifecycleRuleActionArgs(type="Delete"),
-            condition=gcp.storage.BucketLifecycleRuleConditionArgs(age=7),
-        )
-    ],
-    opts=pulumi.ResourceOptions(depends_on=enabled_apis),
+    # Exports stay downloadable for 30 days; after the first day they are
+    # rarely read, so they sit in NEARLINE. COLDLINE is skipped because its
+    # 90-day minimum storage charge outlasts the 30-day retention.
+    lifecycle_rules=_lifecycle_rules(
+        delete_after_days=30, prefix="exports/", nearline_after_days=1
+    ),
+    opts=pulumi.ResourceOptions(depends_on=[enabled_apis["storage"]]),
 )
 
 # MS FHIR Converter is deployed via GitHub Actions (deploy-ms-converter job)
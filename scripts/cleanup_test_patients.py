@@ -7,20 +7,50 @@ resources (encounters, conditions, compositions, etc.).
 """
 
 import argparse
-import subprocess
+import asyncio
 
+import google.auth
+import google.auth.transport.requests
 import httpx
+import orjson
+
+# Patient-compartment resource types, in the order they must be deleted
+# (resources referencing an Encounter go before the Encounter itself)
+DELETE_ORDER = [
+    "Composition",
+    "DiagnosticReport",
+    "DocumentReference",
+    "Observation",
+    "Procedure",
+    "MedicationStatement",
+    "Immunization",
+    "AllergyIntolerance",
+    "Condition",
+    "Encounter",
+]
+
+# Page size for FHIR searches (the Healthcare API maximum)
+SEARCH_PAGE_SIZE = 1000
+
+# Maximum number of DELETE entries sent in a single batch bundle
+BATCH_DELETE_SIZE = 100
+
+# Maximum number of batch bundles in flight, to stay under the FHIR API quota
+MAX_CONCURRENT_BATCHES = 20
+
+# Maximum number of patients cleaned up at the same time
+MAX_CONCURRENT_PATIENTS = 5
 
 
 def get_fhir_access_token() -> str:
     """Get access token for GCP Healthcare FHIR API."""
-    result = subprocess.run(
-        ["gcloud", "auth", "print-access-token"],
-        capture_output=True,
-        text=True,
-        check=True,
+    # Application Default Credentials in-process, instead of forking gcloud
+    credentials, _ = google.auth.default(
+        scopes=["https://www.googleapis.com/auth/cloud-healthcare"]
     )
-    return result.stdout.strip()
+    auth_req = google.auth.transport.requests.Request()
+    credentials.refresh(auth_req)
+    return credentials.token  # type: ignore[return-value]
 
 
 def get_fhir_base_url(
@@ -33,20 +63,17 @@ def get_fhir_base_url(
     )
 
 
-def search_patients_by_name(base_url: str, token: str, family_name: str) -> list[dict]:
+async def search_patients_by_name(
+    client: httpx.AsyncClient, base_url: str, family_name: str
+) -> list[dict]:
     """Search for patients by family name."""
-    headers = {"Authorization": f"Bearer {token}"}
-    params = {"family": family_name, "_count": "100"}
+    # Only id and name are used, so skip the rest of the resource
+    params = {"family": family_name, "_count": "100", "_elements": "id,name"}
 
-    response = httpx.get(
-        f"{base_url}/Patient",
-        headers=headers,
-        params=params,
-        timeout=30.0,
-    )
+    response = await client.get(f"{base_url}/Patient", params=params)
     response.raise_for_status()
 
-    data = response.json()
+    data = orjson.loads(response.content)
     patients = []
     for entry in data.get("entry", []):
         resource = entry.get("resource", {})
@@ -56,86 +83,152 @@ def search_patients_by_name(base_url: str, token: str, family_name: str) -> list
     return patients
 
 
-def get_related_resources(
-    base_url: str, token: str, patient_id: str
+async def get_related_resources(
+    client: httpx.AsyncClient, base_url: str, patient_id: str
 ) -> dict[str, list[str]]:
-    """Find all resources related to a patient."""
-    headers = {"Authorization": f"Bearer {token}"}
-    related: dict[str, list[str]] = {}
+    """Find all resources related to a patient.
 
-    # Resource types and their patient reference field
-    resource_searches = [
-        ("Encounter", "subject"),
-        ("Condition", "subject"),
-        ("MedicationStatement", "subject"),
-        ("Composition", "subject"),
-        ("Observation", "subject"),
-        ("AllergyIntolerance", "patient"),
-        ("Immunization", "patient"),
-        ("Procedure", "subject"),
-        ("DiagnosticReport", "subject"),
-        ("DocumentReference", "subject"),
-    ]
-
-    for resource_type, field in resource_searches:
+    Uses the Patient $everything operation restricted to DELETE_ORDER types,
+    so the whole compartment is enumerated in one paginated walk instead of
+    one search per resource type.
+    """
+    related: dict[str, list[str]] = {}
+    url: str | None = f"{base_url}/Patient/{patient_id}/$everything"
+    params: dict[str, str] | None = {
+        "_type": ",".join(DELETE_ORDER),
+        "_count": str(SEARCH_PAGE_SIZE),
+    }
+
+    # Follow Bundle.link[next] so large compartments are not truncated
+    while url:
         try:
-            params = {field: f"Patient/{patient_id}", "_count": "500"}
-            response = httpx.get(
-                f"{base_url}/{resource_type}",
-                headers=headers,
-                params=params,
-                timeout=30.0,
-            )
-            if response.status_code == 200:
-                data = response.json()
-                ids = []
-                for entry in data.get("entry", []):
-                    resource = entry.get("resource", {})
-                    if rid := resource.get("id"):
-                        ids.append(rid)
-                if ids:
-                    related[resource_type] = ids
+            response = await client.get(url, params=params)
         except Exception as e:
-            print(f"  Warning: Failed to search {resource_type}: {e}")
+            print(f"  Warning: Failed to fetch compartment: {e}")
+            break
+
+        if response.status_code != 200:
+            print(
+                f"  Warning: Failed to fetch compartment: HTTP {response.status_code}"
+            )
+            break
+
+        data = orjson.loads(response.content)
+        for entry in data.get("entry", []):
+            resource = entry.get("resource", {})
+            resource_type = resource.get("resourceType")
+            rid = resource.get("id")
+            # $everything also returns the Patient itself
+            if rid and resource_type in DELETE_ORDER:
+                related.setdefault(resource_type, []).append(rid)
+
+        # The next link already carries the query parameters
+        url = next(
+            (
+                link.get("url")
+                for link in data.get("link", [])
+                if link.get("relation") == "next"
+            ),
+            None,
+        )
+        params = None
 
     return related
 
 
-def delete_resource(
-    base_url: str, token: str, resource_type: str, resource_id: str
+async def delete_resource(
+    client: httpx.AsyncClient, base_url: str, resource_type: str, resource_id: str
 ) -> bool:
     """Delete a single resource."""
-    headers = {"Authorization": f"Bearer {token}"}
     try:
-        response = httpx.delete(
-            f"{base_url}/{resource_type}/{resource_id}",
-            headers=headers,
-            timeout=30.0,
-        )
+        response = await client.delete(f"{base_url}/{resource_type}/{resource_id}")
         return response.status_code in (200, 204, 410)  # 410 = already deleted
     except Exception as e:
         print(f"  Error deleting {resource_type}/{resource_id}: {e}")
         return False
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Clean up test patients from FHIR store"
-    )
-    parser.add_argument("family_name", help="Family name of patients to delete")
-    parser.add_argument("--project", default="panova-dev", help="GCP project ID")
-    parser.add_argument("--location", default="us-central1", help="GCP location")
-    parser.add_argument("--dataset", default="panova", help="Healthcare dataset")
-    parser.add_argument(
-        "--fhir-store", default="panova-fhir-store", help="FHIR store name"
-    )
-    parser.add_argument(
-        "--dry-run",
-        action="store_true",
-        help="Show what would be deleted without deleting",
+async def _delete_chunk(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    base_url: str,
+    resource_type: str,
+    chunk: list[str],
+) -> tuple[int, list[str]]:
+    """Send one batch bundle of DELETE entries and check each entry's status."""
+    bundle = {
+        "resourceType": "Bundle",
+        "type": "batch",
+        "entry": [
+            {"request": {"method": "DELETE", "url": f"{resource_type}/{rid}"}}
+            for rid in chunk
+        ],
+    }
+    try:
+        async with semaphore:
+            response = await client.post(
+                base_url,
+                headers={"Content-Type": "application/fhir+json"},
+                json=bundle,
+                timeout=60.0,
+            )
+        response.raise_for_status()
+        entries = orjson.loads(response.content).get("entry", [])
+    except Exception as e:
+        print(f"  Error deleting {resource_type} batch: {e}")
+        return 0, [f"{resource_type}/{rid}" for rid in chunk]
+
+    deleted = 0
+    failed: list[str] = []
+    for rid, entry in zip(chunk, entries):
+        status = entry.get("response", {}).get("status", "")
+        # 410 = already deleted
+        if status.split(" ", 1)[0] in ("200", "204", "410"):
+            deleted += 1
+        else:
+            failed.append(f"{resource_type}/{rid}")
+    # Entries missing from the response were not processed
+    failed.extend(f"{resource_type}/{rid}" for rid in chunk[len(entries) :])
+    return deleted, failed
+
+
+async def delete_resources_batch(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    base_url: str,
+    resource_type: str,
+    resource_ids: list[str],
+) -> tuple[int, list[str]]:
+    """Delete resources of one type using FHIR batch bundles.
+
+    Resources are sent in chunks of BATCH_DELETE_SIZE DELETE entries so a
+    patient with hundreds of resources costs a handful of requests instead
+    of one request per resource. Chunks of the same type do not reference
+    each other, so they are sent concurrently, bounded by the semaphore.
+
+    Returns:
+        Tuple of (number deleted, list of "Type/id" references that failed)
+    """
+    results = await asyncio.gather(
+        *[
+            _delete_chunk(
+                client,
+                semaphore,
+                base_url,
+                resource_type,
+                resource_ids[start : start + BATCH_DELETE_SIZE],
+            )
+            for start in range(0, len(resource_ids), BATCH_DELETE_SIZE)
+        ]
     )
-    args = parser.parse_args()
 
+    deleted = sum(count for count, _ in results)
+    failed = [ref for _, refs in results for ref in refs]
+    return deleted, failed
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Find and delete the matching patients using one pooled HTTP client."""
     print("Getting access token...")
     token = get_fhir_access_token()
 
@@ -144,8 +237,65 @@ def main():
     )
     print(f"FHIR store: {base_url}")
 
+    async with httpx.AsyncClient(
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=30.0,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+    ) as client:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
+        await _cleanup_patients(client, semaphore, base_url, args)
+
+
+async def _cleanup_patient(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    base_url: str,
+    patient_id: str,
+    dry_run: bool,
+) -> tuple[int, list[str]]:
+    """Delete one patient and its related resources.
+
+    Returns:
+        Tuple of (number deleted, report lines to print for this patient)
+    """
+    lines = [f"\nPatient {patient_id}:"]
+    total_deleted = 0
+
+    # Get related resources
+    related = await get_related_resources(client, base_url, patient_id)
+
+    # Delete related resources first (in order)
+    for resource_type in DELETE_ORDER:
+        if resource_type in related:
+            ids = related[resource_type]
+            lines.append(f"  {resource_type}: {len(ids)} resource(s)")
+            if not dry_run:
+                deleted, failed = await delete_resources_batch(
+                    client, semaphore, base_url, resource_type, ids
+                )
+                total_deleted += deleted
+                lines.extend(f"    Failed to delete {ref}" for ref in failed)
+
+    # Delete the patient
+    lines.append("  Patient: 1 resource")
+    if not dry_run:
+        if await delete_resource(client, base_url, "Patient", patient_id):
+            total_deleted += 1
+        else:
+            lines.append(f"    Failed to delete Patient/{patient_id}")
+
+    return total_deleted, lines
+
+
+async def _cleanup_patients(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    base_url: str,
+    args: argparse.Namespace,
+) -> None:
+    """Search for matching patients and delete them with their resources."""
     print(f"\nSearching for patients with family name '{args.family_name}'...")
-    patients = search_patients_by_name(base_url, token, args.family_name)
+    patients = await search_patients_by_name(client, base_url, args.family_name)
 
     if not patients:
         print("No patients found.")
@@ -163,49 +313,24 @@ def main():
     else:
         print("\nDeleting resources...")
 
-    total_deleted = 0
-    for patient in patients:
-        patient_id = patient.get("id")
-        if not patient_id:
-            continue
-
-        print(f"\nPatient {patient_id}:")
-
-        # Get related resources
-        related = get_related_resources(base_url, token, patient_id)
-
-        # Delete related resources first (in order)
-        delete_order = [
-            "Composition",
-            "DiagnosticReport",
-            "DocumentReference",
-            "Observation",
-            "Procedure",
-            "MedicationStatement",
-            "Immunization",
-            "AllergyIntolerance",
-            "Condition",
-            "Encounter",
-        ]
+    patient_semaphore = asyncio.Semaphore(MAX_CONCURRENT_PATIENTS)
 
-        for resource_type in delete_order:
-            if resource_type in related:
-                ids = related[resource_type]
-                print(f"  {resource_type}: {len(ids)} resource(s)")
-                if not args.dry_run:
-                    for rid in ids:
-                        if delete_resource(base_url, token, resource_type, rid):
-                            total_deleted += 1
-                        else:
-                            print(f"    Failed to delete {resource_type}/{rid}")
-
-        # Delete the patient
-        print("  Patient: 1 resource")
-        if not args.dry_run:
-            if delete_resource(base_url, token, "Patient", patient_id):
-                total_deleted += 1
-            else:
-                print(f"    Failed to delete Patient/{patient_id}")
+    async def guarded(patient_id: str) -> tuple[int, list[str]]:
+        async with patient_semaphore:
+            return await _cleanup_patient(
+                client, semaphore, base_url, patient_id, args.dry_run
+            )
+
+    # Patients are independent, so they are cleaned up concurrently; each
+    # one's report is buffered and printed in search order
+    results = await asyncio.gather(
+        *[guarded(patient["id"]) for patient in patients if patient.get("id")]
+    )
+
+    total_deleted = 0
+    for deleted, lines in results:
+        total_deleted += deleted
+        print("\n".join(lines))
 
     if args.dry_run:
         print("\n[DRY RUN] No resources were deleted.")
@@ -213,5 +338,25 @@ def main():
         print(f"\nDeleted {total_deleted} resource(s) total.")
 
 
+def main():
+    parser = argparse.ArgumentParser(
+        description="Clean up test patients from FHIR store"
+    )
+    parser.add_argument("family_name", help="Family name of patients to delete")
+    parser.add_argument("--project", default="panova-dev", help="GCP project ID")
+    parser.add_argument("--location", default="us-central1", help="GCP location")
+    parser.add_argument("--dataset", default="panova", help="Healthcare dataset")
+    parser.add_argument(
+        "--fhir-store", default="panova-fhir-store", help="FHIR store name"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show what would be deleted without deleting",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
 if __name__ == "__main__":
     main()
@@ -24,16 +24,20 @@ Requirements:
 """
 
 import argparse
-import base64
+import asyncio
+import csv
+import io
 import sys
-from datetime import datetime, timedelta, timezone
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, TextIO
 
 import google.auth
 import google.auth.transport.requests
 import httpx
 import jwt
+import orjson
 from google.cloud import secretmanager
 
 # Environment configuration
@@ -55,6 +59,11 @@ ENVIRONMENTS = {
     },
 }
 
+# Large exports are uploaded in chunks of about this many rows, a few at a time,
+# so each request stays well inside the server timeout
+IMPORT_CHUNK_ROWS = 500
+MAX_CONCURRENT_UPLOADS = 8
+
 # Service auth configuration
 SERVICE_AUTH_ISSUER = "panova-services"
 SERVICE_AUTH_AUDIENCE_PORTIA = "panova-portia"
@@ -68,37 +77,88 @@ def get_jwt_secret(project_id: str) -> str:
     return response.payload.data.decode("utf-8")
 
 
+# Signed tokens keyed by (audience, service_name) -> (token, exp)
+_SIGNED_TOKEN_CACHE: dict[tuple[str, str], tuple[str, int]] = {}
+
+
 def create_service_token(
     secret: str, audience: str, service_name: str = "portia-cli"
 ) -> str:
-    """Create a service JWT token."""
-    now = datetime.now(timezone.utc)
-    expires = now + timedelta(hours=1)
+    """Create a service JWT token, reusing a cached one until near expiry."""
+    now = int(time.time())
+    cached = _SIGNED_TOKEN_CACHE.get((audience, service_name))
+    if cached and cached[1] - now > 60:
+        return cached[0]
+
+    expires = now + 3600
 
     payload = {
         "service_name": service_name,
         "iss": SERVICE_AUTH_ISSUER,
         "sub": f"service:{service_name}",
         "aud": audience,
-        "iat": int(now.timestamp()),
-        "exp": int(expires.timestamp()),
+        "iat": now,
+        "exp": expires,
         "permissions": ["import.write", "fhir.write"],
     }
 
-    return jwt.encode(payload, secret, algorithm="HS256")
+    token = jwt.encode(payload, secret, algorithm="HS256")
+    _SIGNED_TOKEN_CACHE[(audience, service_name)] = (token, expires)
+    return token
+
+
+# ADC credentials and auth transport, created once and refreshed near expiry
+_fhir_credentials: Any = None
+_auth_request: Any = None
+
+# Refresh the access token when it has less than this many seconds left
+FHIR_TOKEN_REFRESH_MARGIN_SECONDS = 300
 
 
 def get_fhir_access_token() -> str:
-    """Get Google Cloud access token for FHIR API."""
-    credentials, _ = google.auth.default(
-        scopes=["https://www.googleapis.com/auth/cloud-healthcare"]
+    """Get Google Cloud access token for FHIR API, reusing it until near expiry."""
+    global _fhir_credentials, _auth_request
+
+    if _fhir_credentials is None:
+        _fhir_credentials, _ = google.auth.default(
+            scopes=["https://www.googleapis.com/auth/cloud-healthcare"]
+        )
+        _auth_request = google.auth.transport.requests.Request()
+
+    # google-auth reports expiry as a naive UTC datetime
+    expiry = _fhir_credentials.expiry
+    if (
+        not _fhir_credentials.token
+        or expiry is None
+        or expiry.replace(tzinfo=timezone.utc).timestamp() - time.time()
+        <= FHIR_TOKEN_REFRESH_MARGIN_SECONDS
+    ):
+        _fhir_credentials.refresh(_auth_request)
+    return _fhir_credentials.token  # type: ignore[no-any-return]
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP client shared by every request in a run.
+
+    FHIR and Portia use different credentials, so auth headers are passed
+    per request rather than set on the client.
+    """
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(30.0, connect=5.0, pool=5.0),
     )
-    auth_req = google.auth.transport.requests.Request()
-    credentials.refresh(auth_req)
-    return credentials.token  # type: ignore[return-value]
 
 
-def lookup_practitioner_by_name(
+def fhir_headers(access_token: str) -> dict[str, str]:
+    """Build request headers for the GCP Healthcare FHIR API."""
+    return {
+        "Authorization": f"Bearer {access_token}",
+        "Accept": "application/fhir+json",
+    }
+
+
+async def lookup_practitioner_by_name(
+    client: httpx.AsyncClient,
+    headers: dict[str, str],
     fhir_store: str,
     name: str,
 ) -> dict[str, str | None]:
@@ -106,32 +166,25 @@ def lookup_practitioner_by_name(
     Look up practitioner by name via FHIR.
 
     Args:
+        client: Shared HTTP client from create_http_client
+        headers: FHIR auth headers from fhir_headers
         fhir_store: Full FHIR store path
         name: Practitioner name (e.g., "Kamen Penev")
 
     Returns:
         Dict with practitioner_id and display_name
     """
-    access_token = get_fhir_access_token()
     fhir_url = f"https://healthcare.googleapis.com/v1/{fhir_store}/fhir"
 
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/fhir+json",
-    }
-
     # Search by name
-    response = httpx.get(
-        f"{fhir_url}/Practitioner",
-        headers=headers,
-        params={"name": name},
-        timeout=30.0,
+    response = await client.get(
+        f"{fhir_url}/Practitioner", headers=headers, params={"name": name}
     )
 
     if response.status_code != 200:
         raise ValueError(f"FHIR search failed: {response.status_code} {response.text}")
 
-    bundle = response.json()
+    bundle = orjson.loads(response.content)
     entries = bundle.get("entry", [])
 
     if not entries:
@@ -160,7 +213,9 @@ def lookup_practitioner_by_name(
     }
 
 
-def lookup_practitioner_role(
+async def lookup_practitioner_role(
+    client: httpx.AsyncClient,
+    headers: dict[str, str],
     fhir_store: str,
     practitioner_id: str,
     organization_id: str | None = None,
@@ -169,6 +224,8 @@ def lookup_practitioner_role(
     Look up PractitionerRole for a practitioner via FHIR.
 
     Args:
+        client: Shared HTTP client from create_http_client
+        headers: FHIR auth headers from fhir_headers
         fhir_store: Full FHIR store path
         practitioner_id: Practitioner resource ID (UUID)
         organization_id: Optional organization to filter by
@@ -176,29 +233,20 @@ def lookup_practitioner_role(
     Returns:
         Dict with practitioner_role_id and organization_id
     """
-    access_token = get_fhir_access_token()
     fhir_url = f"https://healthcare.googleapis.com/v1/{fhir_store}/fhir"
 
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/fhir+json",
-    }
-
     params: dict[str, str] = {"practitioner": f"Practitioner/{practitioner_id}"}
     if organization_id:
         params["organization"] = f"Organization/{organization_id}"
 
-    response = httpx.get(
-        f"{fhir_url}/PractitionerRole",
-        headers=headers,
-        params=params,
-        timeout=30.0,
+    response = await client.get(
+        f"{fhir_url}/PractitionerRole", headers=headers, params=params
     )
 
     if response.status_code != 200:
         return {"practitioner_role_id": None, "organization_id": None}
 
-    bundle = response.json()
+    bundle = orjson.loads(response.content)
     entries = bundle.get("entry", [])
 
     if not entries:
@@ -215,146 +263,213 @@ def lookup_practitioner_role(
     return {"practitioner_role_id": role_id, "organization_id": org_id}
 
 
-def import_appointments(
+# DOB formats Portia's CSV parser accepts (Charm's own "26-Sep-44" first)
+_DOB_FORMATS = ("%d-%b-%y", "%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y")
+
+
+def patient_key(
+    patient_name: str, dob: str
+) -> tuple[str, str, tuple[int, int, int] | None]:
+    """
+    Key rows the way Portia's importer identifies a patient.
+
+    The importer serializes rows by (given, family, birth date) with names
+    casefolded, splitting the name as its CSV parser does (last word is the
+    family name). The DOB is keyed by month, day and 2-digit year, which the
+    importer's century adjustment never changes, so rows the importer treats
+    as one patient always share a key.
+    """
+    parts = patient_name.split()
+    if len(parts) > 1:
+        given, family = " ".join(parts[:-1]), parts[-1]
+    else:
+        given, family = patient_name.strip(), ""
+    birth_date = None
+    for fmt in _DOB_FORMATS:
+        try:
+            parsed = datetime.strptime(dob, fmt)
+        except ValueError:
+            continue
+        birth_date = (parsed.month, parsed.day, parsed.year % 100)
+        break
+    return given.casefold(), family.casefold(), birth_date
+
+
+def split_csv(
+    csv_file: TextIO, chunk_rows: int = IMPORT_CHUNK_ROWS
+) -> tuple[list[bytes], int]:
+    """
+    Split an appointment CSV into header-prefixed chunks.
+
+    The file is read row by row, so the raw file and its decoded text are
+    never held in memory alongside the chunks.
+
+    All rows for one patient go into the same chunk, keyed by the importer's
+    own patient identity (see patient_key) rather than Record ID, so chunks
+    imported in parallel never race to create the same patient. A patient
+    with more rows than chunk_rows gets a chunk of their own.
+
+    Args:
+        csv_file: CSV file opened in text mode with newline=""
+        chunk_rows: Target number of data rows per chunk
+
+    Returns:
+        Tuple of (CSV chunks each starting with the original header row,
+        number of data rows)
+    """
+    reader = csv.reader(csv_file)
+    header = next(reader, None)
+    if header is None:
+        return [], 0
+
+    columns = {name.strip(): i for i, name in enumerate(header)}
+
+    def cell(row: list[str], name: str) -> str:
+        i = columns.get(name)
+        return row[i].strip() if i is not None and i < len(row) else ""
+
+    # Group rows by patient, keeping first-appearance order
+    patients: dict[tuple[str, str, tuple[int, int, int] | None], list[list[str]]] = {}
+    row_count = 0
+    for row in reader:
+        if not any(row):
+            continue
+        row_count += 1
+        key = patient_key(cell(row, "Patient Name"), cell(row, "DOB"))
+        patients.setdefault(key, []).append(row)
+
+    batches: list[list[list[str]]] = []
+    current: list[list[str]] = []
+    for rows in patients.values():
+        if current and len(current) + len(rows) > chunk_rows:
+            batches.append(current)
+            current = []
+        current.extend(rows)
+    if current:
+        batches.append(current)
+
+    chunks = []
+    for batch in batches:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        writer.writerows(batch)
+        chunks.append(buffer.getvalue().encode("utf-8"))
+    return chunks, row_count
+
+
+async def import_appointments(
+    client: httpx.AsyncClient,
     portia_url: str,
     token: str,
-    file_content: bytes,
+    csv_content: bytes,
+    filename: str,
     organization_id: str,
     practitioner_role_id: str,
 ) -> dict[str, Any]:
-    """Import appointment CSV content to Portia."""
-    encoded_data = base64.b64encode(file_content).decode("utf-8")
-
-    payload: dict[str, Any] = {
-        "data": encoded_data,
+    """Upload an appointment CSV to Portia as multipart/form-data."""
+    headers = {"Authorization": f"Bearer {token}"}
+    data = {
         "organization_id": organization_id,
         "practitioner_role_id": practitioner_role_id,
     }
 
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-    }
-
-    response = httpx.post(
-        f"{portia_url}/import/appointments",
+    response = await client.post(
+        f"{portia_url}/import/appointments/upload",
         headers=headers,
-        json=payload,
+        data=data,
+        files={"file": (filename, csv_content, "text/csv")},
+        # The server processes the whole upload before responding
         timeout=120.0,
     )
 
     response.raise_for_status()
-    result: dict[str, Any] = response.json()
+    result: dict[str, Any] = orjson.loads(response.content)
     return result
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(
-        description="Import CHARM EHR appointment CSV exports into Portia",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-    # Import a CHARM appointment CSV for a practitioner in dev environment
-    python scripts/import_charm_appointments.py appointments.csv "Kamen Penev" --env dev
-
-    # Import to staging environment
-    python scripts/import_charm_appointments.py appointments.csv "Jane Smith" --env staging
-
-    # Import with explicit IDs (skips practitioner lookup)
-    python scripts/import_charm_appointments.py appointments.csv --env dev \\
-        --org-id 12345678-1234-1234-1234-123456789abc \\
-        --practitioner-role-id 87654321-4321-4321-4321-cba987654321
-
-    # Dry run to validate inputs
-    python scripts/import_charm_appointments.py appointments.csv "Kamen Penev" --env dev --dry-run
-        """,
-    )
-
-    parser.add_argument(
-        "file_path",
-        type=Path,
-        help="Path to the Charm appointment CSV file to import",
-    )
-
-    parser.add_argument(
-        "practitioner_name",
-        nargs="?",
-        help="Practitioner name (e.g., 'Kamen Penev')",
-    )
-
-    parser.add_argument(
-        "--env",
-        choices=["dev", "staging", "prod"],
-        default="dev",
-        help="Target environment (default: dev)",
-    )
+async def import_appointments_in_chunks(
+    client: httpx.AsyncClient,
+    portia_url: str,
+    token: str,
+    chunks: list[bytes],
+    filename: str,
+    organization_id: str,
+    practitioner_role_id: str,
+) -> dict[str, Any]:
+    """
+    Upload CSV chunks concurrently and combine their results.
 
-    parser.add_argument(
-        "--org-id",
-        dest="organization_id",
-        help="Organization ID (required if practitioner_email not provided)",
-    )
+    A single chunk is uploaded as-is, so HTTP errors propagate to the
+    caller. With several chunks, a failed chunk is reported as a warning
+    and its rows are counted as failed, since the other chunks may
+    already have been imported.
+    """
+    if len(chunks) == 1:
+        return await import_appointments(
+            client,
+            portia_url,
+            token,
+            chunks[0],
+            filename,
+            organization_id,
+            practitioner_role_id,
+        )
 
-    parser.add_argument(
-        "--practitioner-role-id",
-        dest="practitioner_role_id",
-        help="PractitionerRole ID (required if practitioner_email not provided)",
-    )
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
 
-    parser.add_argument(
-        "--dry-run",
-        action="store_true",
-        help="Validate inputs without actually importing",
-    )
+    async def upload(chunk: bytes) -> dict[str, Any]:
+        async with semaphore:
+            return await import_appointments(
+                client,
+                portia_url,
+                token,
+                chunk,
+                filename,
+                organization_id,
+                practitioner_role_id,
+            )
 
-    parser.add_argument(
-        "--verbose",
-        "-v",
-        action="store_true",
-        help="Enable verbose output",
+    outcomes = await asyncio.gather(
+        *[upload(chunk) for chunk in chunks], return_exceptions=True
     )
 
-    args = parser.parse_args()
-
-    # Validate inputs
-    if not args.file_path.exists():
-        print(f"Error: File not found: {args.file_path}", file=sys.stderr)
-        sys.exit(1)
-
-    if not args.file_path.suffix.lower() == ".csv":
-        print(f"Error: Expected CSV file, got: {args.file_path}", file=sys.stderr)
-        sys.exit(1)
-
-    if not args.practitioner_name and not (
-        args.organization_id and args.practitioner_role_id
-    ):
-        print(
-            "Error: Provide practitioner_name or both --org-id and --practitioner-role-id",
-            file=sys.stderr,
-        )
-        sys.exit(1)
-
-    env_config = ENVIRONMENTS[args.env]
-
-    if args.verbose:
-        print(f"Environment: {args.env}")
-        print(f"Portia URL: {env_config['portia_url']}")
-        print(f"FHIR Store: {env_config['fhir_store']}")
-        print(f"File: {args.file_path}")
-
-    # Read file content
-    file_content = args.file_path.read_bytes()
-    print(f"Read {len(file_content):,} bytes from {args.file_path}")
+    combined: dict[str, Any] = {
+        "total_rows": 0,
+        "successful": 0,
+        "failed": 0,
+        "skipped": 0,
+        "results": [],
+        "warnings": [],
+    }
+    for number, (chunk, outcome) in enumerate(zip(chunks, outcomes), start=1):
+        if isinstance(outcome, BaseException):
+            if not isinstance(outcome, Exception):
+                raise outcome
+            rows = len(list(csv.reader(io.StringIO(chunk.decode("utf-8"))))) - 1
+            combined["total_rows"] += rows
+            combined["failed"] += rows
+            reason = (
+                f"HTTP {outcome.response.status_code}"
+                if isinstance(outcome, httpx.HTTPStatusError)
+                else str(outcome)
+            )
+            combined["warnings"].append(
+                f"Chunk {number}/{len(chunks)} ({rows} rows) failed: {reason}"
+            )
+            continue
+        for field in ("total_rows", "successful", "failed", "skipped"):
+            combined[field] += outcome.get(field, 0)
+        combined["results"].extend(outcome.get("results", []))
+        combined["warnings"].extend(outcome.get("warnings", []))
+    return combined
 
-    # Count rows (excluding header)
-    lines = file_content.decode("utf-8").strip().split("\n")
-    row_count = len(lines) - 1  # Subtract header
-    print(f"Found {row_count} appointment(s) in CSV")
 
-    # Get JWT secret
-    print(f"Fetching JWT secret from {env_config['project_id']}...")
+async def _fetch_jwt_secret(project_id: str) -> str:
+    """Fetch the JWT secret off the event loop, exiting on failure."""
+    print(f"Fetching JWT secret from {project_id}...")
     try:
-        jwt_secret = get_jwt_secret(env_config["project_id"])
+        return await asyncio.to_thread(get_jwt_secret, project_id)
     except Exception as e:
         print(f"Error fetching JWT secret: {e}", file=sys.stderr)
         print(
@@ -363,39 +478,62 @@ Examples:
         )
         sys.exit(1)
 
-    # Resolve practitioner context
+
+async def resolve_practitioner_context(
+    client: httpx.AsyncClient, args: argparse.Namespace, fhir_store: str
+) -> tuple[str | None, str | None]:
+    """
+    Resolve organization and PractitionerRole IDs for the import.
+
+    Explicit --org-id/--practitioner-role-id values win; anything missing is
+    looked up from FHIR by practitioner name.
+
+    Returns:
+        Tuple of (organization_id, practitioner_role_id)
+    """
     organization_id = args.organization_id
     practitioner_id = None
     practitioner_role_id = args.practitioner_role_id
 
-    if args.practitioner_name and not (organization_id and practitioner_role_id):
-        print(f"Looking up practitioner: {args.practitioner_name}...")
+    if practitioner_role_id:
+        print(f"Using provided PractitionerRole: {practitioner_role_id}")
+        return organization_id, practitioner_role_id
 
-        try:
-            practitioner_info = lookup_practitioner_by_name(
-                env_config["fhir_store"],
-                args.practitioner_name,
-            )
+    if not args.practitioner_name:
+        return organization_id, practitioner_role_id
 
-            practitioner_id = practitioner_info.get("practitioner_id")
+    # One access token for both lookups
+    access_token = await asyncio.to_thread(get_fhir_access_token)
+    headers = fhir_headers(access_token)
+    print(f"Looking up practitioner: {args.practitioner_name}...")
 
-            if args.verbose:
-                print(f"  Practitioner ID: {practitioner_id}")
-                if practitioner_info.get("display_name"):
-                    print(f"  Name: {practitioner_info['display_name']}")
+    try:
+        practitioner_info = await lookup_practitioner_by_name(
+            client,
+            headers,
+            fhir_store,
+            args.practitioner_name,
+        )
 
-        except Exception as e:
-            print(f"Error looking up practitioner: {e}", file=sys.stderr)
-            sys.exit(1)
+        practitioner_id = practitioner_info.get("practitioner_id")
 
-    # Look up PractitionerRole from FHIR (unless provided directly)
-    if practitioner_role_id:
-        print(f"Using provided PractitionerRole: {practitioner_role_id}")
-    elif practitioner_id:
+        if args.verbose:
+            print(f"  Practitioner ID: {practitioner_id}")
+            if practitioner_info.get("display_name"):
+                print(f"  Name: {practitioner_info['display_name']}")
+
+    except Exception as e:
+        print(f"Error looking up practitioner: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    # Look up PractitionerRole from FHIR
+    if practitioner_id:
         print(f"Looking up PractitionerRole for practitioner {practitioner_id}...")
         try:
-            role_info = lookup_practitioner_role(
-                env_config["fhir_store"],
+            role_info = await lookup_practitioner_role(
+                client,
+                headers,
+                fhir_store,
                 practitioner_id,
                 organization_id,
             )
@@ -411,6 +549,25 @@ Examples:
         except Exception as e:
             print(f"Error looking up PractitionerRole: {e}", file=sys.stderr)
 
+    return organization_id, practitioner_role_id
+
+
+async def _run_import(
+    client: httpx.AsyncClient,
+    args: argparse.Namespace,
+    env_config: dict[str, str],
+    row_count: int,
+    file_size: int,
+    chunks: list[bytes],
+) -> None:
+    """Resolve the import context and upload the CSV over one HTTP client."""
+    # The JWT secret fetch and the practitioner lookups are independent, so
+    # they run concurrently
+    jwt_secret, (organization_id, practitioner_role_id) = await asyncio.gather(
+        _fetch_jwt_secret(env_config["project_id"]),
+        resolve_practitioner_context(client, args, env_config["fhir_store"]),
+    )
+
     if not organization_id:
         print("Error: Could not determine organization ID", file=sys.stderr)
         print("Provide --org-id explicitly.", file=sys.stderr)
@@ -426,8 +583,9 @@ Examples:
         print(f"  Organization ID: {organization_id}")
         print(f"  PractitionerRole ID: {practitioner_role_id}")
         print(f"  Appointments: {row_count}")
-        print(f"  File size: {len(file_content):,} bytes")
-        sys.exit(0)
+        print(f"  File size: {file_size:,} bytes")
+        print(f"  Upload chunks: {len(chunks)}")
+        return
 
     # Create token for Portia
     portia_token = create_service_token(
@@ -438,42 +596,48 @@ Examples:
     # Import the file
     print(f"Importing to {args.env}...")
     try:
-        result = import_appointments(
+        result = await import_appointments_in_chunks(
+            client,
             env_config["portia_url"],
             portia_token,
-            file_content,
+            chunks,
+            args.file_path.name,
             organization_id,
             practitioner_role_id,
         )
 
-        print("\nImport complete!")
-        print(f"  Total rows: {result.get('total_rows', 0)}")
-        print(f"  Successful: {result.get('successful', 0)}")
-        print(f"  Failed: {result.get('failed', 0)}")
-        print(f"  Skipped: {result.get('skipped', 0)}")
+        # Build the report and write it once; verbose output can run to
+        # thousands of lines
+        lines = [
+            "\nImport complete!",
+            f"  Total rows: {result.get('total_rows', 0)}",
+            f"  Successful: {result.get('successful', 0)}",
+            f"  Failed: {result.get('failed', 0)}",
+            f"  Skipped: {result.get('skipped', 0)}",
+        ]
 
         if result.get("warnings"):
-            print(f"  Warnings: {len(result['warnings'])}")
+            lines.append(f"  Warnings: {len(result['warnings'])}")
             if args.verbose:
-                for warning in result["warnings"]:
-                    print(f"    - {warning}")
+                lines.extend(f"    - {warning}" for warning in result["warnings"])
 
-        # Print per-appointment results
+        # Per-appointment results
         if args.verbose and result.get("results"):
-            print("\n  Per-appointment results:")
+            lines.append("\n  Per-appointment results:")
             for r in result["results"]:
                 status = "OK" if r.get("success") else "FAILED"
                 charm_id = r.get("charm_appointment_id", "?")
-                print(f"    [{status}] {charm_id}")
+                lines.append(f"    [{status}] {charm_id}")
                 if r.get("encounter_id"):
-                    print(f"        Encounter: {r['encounter_id']}")
+                    lines.append(f"        Encounter: {r['encounter_id']}")
                 if r.get("gcal_event_id"):
-                    print(f"        GCal: {r['gcal_event_id']}")
+                    lines.append(f"        GCal: {r['gcal_event_id']}")
                 if r.get("error"):
-                    print(f"        Error: {r['error']}")
+                    lines.append(f"        Error: {r['error']}")
                 if r.get("warnings"):
-                    for w in r["warnings"]:
-                        print(f"        Warning: {w}")
+                    lines.extend(f"        Warning: {w}" for w in r["warnings"])
+
+        sys.stdout.write("\n".join(lines) + "\n")
 
     except httpx.HTTPStatusError as e:
         print(
@@ -494,5 +658,131 @@ Examples:
         sys.exit(1)
 
 
+async def run(
+    args: argparse.Namespace,
+    env_config: dict[str, str],
+    row_count: int,
+    file_size: int,
+    chunks: list[bytes],
+) -> None:
+    """Run the import with one pooled client for FHIR and Portia requests."""
+    async with create_http_client() as client:
+        await _run_import(client, args, env_config, row_count, file_size, chunks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Import CHARM EHR appointment CSV exports into Portia",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Import a CHARM appointment CSV for a practitioner in dev environment
+    python scripts/import_charm_appointments.py appointments.csv "Kamen Penev" --env dev
+
+    # Import to staging environment
+    python scripts/import_charm_appointments.py appointments.csv "Jane Smith" --env staging
+
+    # Import with explicit IDs (skips practitioner lookup)
+    python scripts/import_charm_appointments.py appointments.csv --env dev \\
+        --org-id 12345678-1234-1234-1234-123456789abc \\
+        --practitioner-role-id 87654321-4321-4321-4321-cba987654321
+
+    # Dry run to validate inputs
+    python scripts/import_charm_appointments.py appointments.csv "Kamen Penev" --env dev --dry-run
+        """,
+    )
+
+    parser.add_argument(
+        "file_path",
+        type=Path,
+        help="Path to the Charm appointment CSV file to import",
+    )
+
+    parser.add_argument(
+        "practitioner_name",
+        nargs="?",
+        help="Practitioner name (e.g., 'Kamen Penev')",
+    )
+
+    parser.add_argument(
+        "--env",
+        choices=["dev", "staging", "prod"],
+        default="dev",
+        help="Target environment (default: dev)",
+    )
+
+    parser.add_argument(
+        "--org-id",
+        dest="organization_id",
+        help="Organization ID (required if practitioner_email not provided)",
+    )
+
+    parser.add_argument(
+        "--practitioner-role-id",
+        dest="practitioner_role_id",
+        help="PractitionerRole ID (required if practitioner_email not provided)",
+    )
+
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Validate inputs without actually importing",
+    )
+
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="store_true",
+        help="Enable verbose output",
+    )
+
+    args = parser.parse_args()
+
+    # Validate inputs
+    if not args.file_path.exists():
+        print(f"Error: File not found: {args.file_path}", file=sys.stderr)
+        sys.exit(1)
+
+    if not args.file_path.suffix.lower() == ".csv":
+        print(f"Error: Expected CSV file, got: {args.file_path}", file=sys.stderr)
+        sys.exit(1)
+
+    if not args.practitioner_name and not (
+        args.organization_id and args.practitioner_role_id
+    ):
+        print(
+            "Error: Provide practitioner_name or both --org-id and --practitioner-role-id",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    env_config = ENVIRONMENTS[args.env]
+
+    if args.verbose:
+        print(f"Environment: {args.env}")
+        print(f"Portia URL: {env_config['portia_url']}")
+        print(f"FHIR Store: {env_config['fhir_store']}")
+        print(f"File: {args.file_path}")
+
+    # Stream the file straight into upload chunks, counting rows on the way
+    file_size = args.file_path.stat().st_size
+    try:
+        with args.file_path.open(encoding="utf-8", newline="") as f:
+            chunks, row_count = split_csv(f)
+    except (UnicodeDecodeError, csv.Error) as e:
+        print(f"Error: Could not read CSV: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Read {file_size:,} bytes from {args.file_path}")
+    print(f"Found {row_count} appointment(s) in CSV")
+
+    if not chunks:
+        print("Error: No appointment rows found in CSV", file=sys.stderr)
+        sys.exit(1)
+    if len(chunks) > 1:
+        print(f"Uploading in {len(chunks)} chunks of up to {IMPORT_CHUNK_ROWS} rows")
+
+    asyncio.run(run(args, env_config, row_count, file_size, chunks))
+
+
 if __name__ == "__main__":
     main()
@@ -23,7 +23,7 @@ Requirements:
 import argparse
 import base64
 import sys
-from datetime import datetime, timedelta, timezone
+import time
 from pathlib import Path
 from typing import Any
 
@@ -73,16 +73,16 @@ def create_service_token(
     secret: str, audience: str, service_name: str = "portia-cli"
 ) -> str:
     """Create a service JWT token."""
-    now = datetime.now(timezone.utc)
-    expires = now + timedelta(hours=1)
+    now = int(time.time())
+    expires = now + 3600
 
     payload = {
         "service_name": service_name,
         "iss": SERVICE_AUTH_ISSUER,
         "sub": f"service:{service_name}",
         "aud": audience,
-        "iat": int(now.timestamp()),
-        "exp": int(expires.timestamp()),
+        "iat": now,
+        "exp": expires,
         "permissions": ["import.write", "fhir.write"],
     }
 
@@ -1,19 +1,15 @@
 """Sentia service dependency provider."""
 
 from collections.abc import AsyncGenerator
+from functools import lru_cache
 
 from src.services.sentia_service import SentiaService
 
-# Module-level singleton
-_sentia_service: SentiaService | None = None
-
 
+@lru_cache(maxsize=1)
 def get_sentia_service() -> SentiaService:
     """Get the Sentia service singleton."""
-    global _sentia_service
-    if _sentia_service is None:
-        _sentia_service = SentiaService()
-    return _sentia_service
+    return SentiaService()
 
 
 async def get_sentia_service_async() -> AsyncGenerator[SentiaService, None]:
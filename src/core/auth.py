@@ -14,27 +14,84 @@ Usage:
         pass
 """
 
+import hashlib
 import os
-from datetime import datetime, timedelta, timezone
-from typing import Annotated, Any
-
-import cachecontrol
-import google.auth.transport.requests
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Annotated, Any, Callable, Mapping
+
+import httpx
 import jwt
-import requests
+import orjson
 from fastapi import Depends, HTTPException, Request, status
-from google.oauth2 import id_token
-from pydantic import BaseModel
+from pydantic import BaseModel, SkipValidation
 from typing_extensions import NotRequired, Required, TypedDict
 
 from src.settings import settings
 from src.utils.secret_manager import get_secret
 
-# Firebase token verification setup
-_cached_session = cachecontrol.CacheControl(requests.session())
-_cached_request = google.auth.transport.requests.Request(  # type: ignore[no-untyped-call]
-    session=_cached_session
+# Firebase token verification setup: the x509 signing certificates are
+# cached in-process, so verifying a token is pure crypto with no HTTP call
+FIREBASE_CERTS_URL = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/"
+    "securetoken@system.gserviceaccount.com"
 )
+# Background refresh interval, ahead of Google's usual one-hour max-age
+FIREBASE_CERTS_REFRESH_SECONDS = 50 * 60
+_FIREBASE_CERTS_DEFAULT_MAX_AGE_SECONDS = 3600
+_MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+# (kid -> PEM certificate, expiry timestamp), swapped atomically on refresh
+_firebase_certs: tuple[dict[str, str], float] = ({}, 0.0)
+_firebase_certs_lock = threading.Lock()
+
+
+def refresh_firebase_certs() -> dict[str, str]:
+    """Fetch the Firebase signing certificates into the in-process cache.
+
+    The cache lifetime follows the response's Cache-Control max-age.
+
+    Returns:
+        Mapping of key ID to PEM-encoded x509 certificate
+    """
+    global _firebase_certs
+
+    response = httpx.get(FIREBASE_CERTS_URL, timeout=10.0)
+    response.raise_for_status()
+    certs: dict[str, str] = orjson.loads(response.content)
+
+    match = _MAX_AGE_PATTERN.search(response.headers.get("cache-control", ""))
+    max_age = int(match.group(1)) if match else _FIREBASE_CERTS_DEFAULT_MAX_AGE_SECONDS
+    _firebase_certs = (certs, time.time() + max_age)
+    return certs
+
+
+@lru_cache(maxsize=1)
+def _firebase_token_decoder() -> Callable[..., Any]:
+    """Import google.auth's JWT decoder on first Firebase verify.
+
+    Deferred so the google.auth import is not paid during cold start.
+    """
+    from google.auth import jwt as google_jwt
+
+    decode: Callable[..., Any] = google_jwt.decode
+    return decode
+
+
+def _get_firebase_certs() -> dict[str, str]:
+    """Return the cached Firebase certificates, fetching them if stale."""
+    certs, expiry = _firebase_certs
+    if expiry > time.time():
+        return certs
+    with _firebase_certs_lock:
+        # Another thread may have refreshed while we waited for the lock
+        certs, expiry = _firebase_certs
+        if expiry > time.time():
+            return certs
+        return refresh_firebase_certs()
 
 
 class FirebaseTokenPayload(TypedDict):
@@ -77,8 +134,10 @@ class AuthenticatedUser(BaseModel):
     # Raw token for forwarding to other services (e.g., Sentia)
     raw_token: str | None = None
 
-    # Full payloads for detailed access
-    firebase_payload: dict[str, Any] | None = None
+    # Full payloads for detailed access. The Firebase payload is the verified
+    # token's own (cached) mapping, stored without copying or re-validation;
+    # treat it as read-only.
+    firebase_payload: SkipValidation[Mapping[str, Any] | None] = None
     service_payload: ServiceTokenPayload | None = None
 
 
@@ -86,28 +145,123 @@ class AuthenticatedUser(BaseModel):
 SERVICE_AUTH_ISSUER = "panova-services"
 SERVICE_AUTH_AUDIENCE = "panova-portia"
 
-# Lazy-loaded JWT secret
-_SERVICE_AUTH_SECRET: str | None = None
-
 
+@lru_cache(maxsize=1)
 def _get_service_auth_secret() -> str:
-    """Get the JWT secret, loading from Secret Manager on first access."""
-    global _SERVICE_AUTH_SECRET
-    if _SERVICE_AUTH_SECRET is None:
-        try:
-            _SERVICE_AUTH_SECRET = get_secret("service-auth-jwt-secret")
-        except Exception as e:
-            raise RuntimeError(
-                f"Failed to get JWT secret from Secret Manager: {e}. "
-                f"Ensure the service has secretmanager.secretAccessor role for "
-                f"projects/{settings.gcp_project_id}/secrets/service-auth-jwt-secret"
-            ) from e
-    return _SERVICE_AUTH_SECRET
+    """Get the JWT secret, loading from Secret Manager on first access.
+
+    Warmed during app startup (see warm_auth_caches) so the first
+    authenticated request does not pay the Secret Manager round trip.
+    Failures are not cached.
+    """
+    try:
+        return get_secret("service-auth-jwt-secret")
+    except Exception as e:
+        raise RuntimeError(
+            f"Failed to get JWT secret from Secret Manager: {e}. "
+            f"Ensure the service has secretmanager.secretAccessor role for "
+            f"projects/{settings.gcp_project_id}/secrets/service-auth-jwt-secret"
+        ) from e
+
+
+@lru_cache(maxsize=1)
+def _get_service_auth_key() -> bytes:
+    """Get the JWT secret as bytes, so HMAC key preparation skips re-encoding."""
+    return _get_service_auth_secret().encode()
+
+
+def warm_auth_caches() -> None:
+    """Load the service JWT secret ahead of the first authenticated request.
+
+    Blocking; run it off the event loop during startup.
+
+    Raises:
+        RuntimeError: If the secret cannot be loaded from Secret Manager
+    """
+    _get_service_auth_key()
+
+
+# Shared encoder/decoder with options fixed once instead of merged per call
+_SERVICE_JWT = jwt.PyJWT(
+    options={"verify_exp": True, "require": ["exp", "aud", "iss"]},
+)
+
+
+# Verified tokens keyed by sha256(token) -> (auth_type, payload, cache expiry).
+# The full digest is used so a key collision cannot authenticate another token.
+# When full, the oldest entry is evicted; expired entries are dropped on lookup.
+_VERIFIED_TOKEN_CACHE: OrderedDict[bytes, tuple[str, Any, float]] = OrderedDict()
+_VERIFIED_TOKEN_CACHE_MAX_SIZE = 10_000
+_VERIFIED_TOKEN_CACHE_TTL_SECONDS = 900
+
+
+def _token_cache_key(token: str) -> bytes:
+    """Hash a raw token so the cache does not hold bearer credentials."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _get_cached_verification(key: bytes) -> tuple[str, Any] | None:
+    """Return (auth_type, payload) for a previously verified token, if fresh."""
+    entry = _VERIFIED_TOKEN_CACHE.get(key)
+    if entry is None:
+        return None
+    auth_type, payload, expiry = entry
+    if expiry <= time.time():
+        _VERIFIED_TOKEN_CACHE.pop(key, None)
+        return None
+    return auth_type, payload
+
+
+def _cache_verification(key: bytes, auth_type: str, payload: Any, exp: int) -> None:
+    """Remember a verified token until its exp or the cache TTL, whichever is first."""
+    if (
+        key not in _VERIFIED_TOKEN_CACHE
+        and len(_VERIFIED_TOKEN_CACHE) >= _VERIFIED_TOKEN_CACHE_MAX_SIZE
+    ):
+        _VERIFIED_TOKEN_CACHE.popitem(last=False)
+    _VERIFIED_TOKEN_CACHE[key] = (
+        auth_type,
+        payload,
+        min(exp, time.time() + _VERIFIED_TOKEN_CACHE_TTL_SECONDS),
+    )
+
+
+# Recently rejected tokens keyed by (auth_type, sha256(token)) -> reject-until.
+# Repeat attempts with a known-bad token skip the crypto for a short while.
+# Every entry gets the same TTL, so insertion order is expiry order.
+_REJECTED_TOKEN_CACHE: OrderedDict[tuple[str, bytes], float] = OrderedDict()
+_REJECTED_TOKEN_CACHE_MAX_SIZE = 10_000
+_REJECTED_TOKEN_CACHE_TTL_SECONDS = 30
+
+
+def _is_recently_rejected(auth_type: str, key: bytes) -> bool:
+    """Check whether a verifier rejected this token within the TTL."""
+    reject_until = _REJECTED_TOKEN_CACHE.get((auth_type, key))
+    if reject_until is None:
+        return False
+    if reject_until <= time.time():
+        _REJECTED_TOKEN_CACHE.pop((auth_type, key), None)
+        return False
+    return True
+
+
+def _cache_rejection(auth_type: str, key: bytes) -> None:
+    """Remember that a verifier rejected this token."""
+    cache_key = (auth_type, key)
+    # Re-inserted at the end so the oldest entry is still the first to expire
+    _REJECTED_TOKEN_CACHE.pop(cache_key, None)
+    if len(_REJECTED_TOKEN_CACHE) >= _REJECTED_TOKEN_CACHE_MAX_SIZE:
+        _REJECTED_TOKEN_CACHE.popitem(last=False)
+    _REJECTED_TOKEN_CACHE[cache_key] = time.time() + _REJECTED_TOKEN_CACHE_TTL_SECONDS
 
 
 def verify_firebase_token(token: str) -> FirebaseTokenPayload:
     """Verify a Firebase ID token.
 
+    Successful verifications are cached until the token expires, so repeat
+    requests with the same token skip signature verification. Rejections are
+    remembered for a short TTL.
+
     Args:
         token: The Firebase ID token to verify
 
@@ -117,24 +271,59 @@ def verify_firebase_token(token: str) -> FirebaseTokenPayload:
     Raises:
         HTTPException: If the token is invalid or expired
     """
+    key = _token_cache_key(token)
+    cached = _get_cached_verification(key)
+    if cached is not None:
+        auth_type, cached_payload = cached
+        if auth_type == "firebase":
+            firebase_payload: FirebaseTokenPayload = cached_payload
+            return firebase_payload
+        # Known service token: skip the Firebase round trip
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired Firebase token: not a Firebase token",
+        )
+
+    if _is_recently_rejected("firebase", key):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired Firebase token: recently rejected",
+        )
+
     try:
-        payload: FirebaseTokenPayload = id_token.verify_firebase_token(  # type: ignore[no-untyped-call]
+        certs = _get_firebase_certs()
+    except Exception as e:
+        # A certificate fetch failure says nothing about the token, so it is
+        # not remembered as a rejection
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Invalid or expired Firebase token: {e}",
+        ) from e
+
+    try:
+        payload: FirebaseTokenPayload = _firebase_token_decoder()(
             token,
-            _cached_request,
+            certs=certs,
             audience=settings.gcp_project_id,
             clock_skew_in_seconds=10,
         )
-        return payload
     except Exception as e:
+        _cache_rejection("firebase", key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid or expired Firebase token: {e}",
         ) from e
 
+    _cache_verification(key, "firebase", payload, payload["exp"])
+    return payload
+
 
 def verify_service_token(token: str) -> ServiceTokenPayload:
     """Verify a service JWT token.
 
+    Successful verifications are cached until the token expires; rejections
+    are remembered for a short TTL.
+
     Args:
         token: The JWT token to verify
 
@@ -144,27 +333,56 @@ def verify_service_token(token: str) -> ServiceTokenPayload:
     Raises:
         HTTPException: If the token is invalid or expired
     """
+    key = _token_cache_key(token)
+    cached = _get_cached_verification(key)
+    if cached is not None:
+        auth_type, cached_payload = cached
+        if auth_type == "service":
+            service_payload: ServiceTokenPayload = cached_payload
+            return service_payload
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid service token: not a service token",
+        )
+
+    if _is_recently_rejected("service", key):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid service token: recently rejected",
+        )
+
     try:
-        payload = jwt.decode(
+        payload = _SERVICE_JWT.decode(
             token,
-            _get_service_auth_secret(),
+            _get_service_auth_key(),
             algorithms=["HS256"],
             audience=SERVICE_AUTH_AUDIENCE,
             issuer=SERVICE_AUTH_ISSUER,
-            options={"verify_exp": True},
         )
-        return ServiceTokenPayload(**payload)
+        result = ServiceTokenPayload(**payload)
     except jwt.ExpiredSignatureError as e:
+        _cache_rejection("service", key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Service token has expired",
         ) from e
     except jwt.InvalidTokenError as e:
+        _cache_rejection("service", key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid service token: {e}",
         ) from e
 
+    _cache_verification(key, "service", result, result.exp)
+    return result
+
+
+# Signed service tokens keyed by (service_name, permissions, expires_hours,
+# environment) -> (token, exp). Reused until shortly before they expire.
+_SIGNED_TOKEN_CACHE: dict[tuple[str, tuple[str, ...], int, str], tuple[str, int]] = {}
+_SIGNED_TOKEN_CACHE_MAX_SIZE = 128
+_SIGNED_TOKEN_REFRESH_MARGIN_SECONDS = 60
+
 
 def create_service_token(
     service_name: str,
@@ -173,6 +391,9 @@ def create_service_token(
 ) -> str:
     """Create a service JWT token for service-to-service auth.
 
+    Tokens are cached per service, permission set and lifetime, and the same
+    signed token is returned until it is within a minute of expiring.
+
     Args:
         service_name: Name of the calling service
         permissions: List of permission strings
@@ -181,21 +402,38 @@ def create_service_token(
     Returns:
         The signed JWT token
     """
-    now = datetime.now(timezone.utc)
-    expires = now + timedelta(hours=expires_hours)
+    environment = os.getenv("ENVIRONMENT", "production")
+    cache_key = (
+        service_name,
+        tuple(sorted(permissions or [])),
+        expires_hours,
+        environment,
+    )
+    now = int(time.time())
+
+    cached = _SIGNED_TOKEN_CACHE.get(cache_key)
+    if cached and cached[1] - now > _SIGNED_TOKEN_REFRESH_MARGIN_SECONDS:
+        return cached[0]
 
+    expires = now + expires_hours * 3600
     payload = {
         "service_name": service_name,
         "iss": SERVICE_AUTH_ISSUER,
         "sub": f"service:{service_name}",
         "aud": SERVICE_AUTH_AUDIENCE,
-        "iat": int(now.timestamp()),
-        "exp": int(expires.timestamp()),
+        "iat": now,
+        "exp": expires,
         "permissions": permissions or [],
-        "environment": os.getenv("ENVIRONMENT", "production"),
+        "environment": environment,
     }
 
-    return jwt.encode(payload, _get_service_auth_secret(), algorithm="HS256")
+    token = _SERVICE_JWT.encode(payload, _get_service_auth_key(), algorithm="HS256")
+
+    if len(_SIGNED_TOKEN_CACHE) >= _SIGNED_TOKEN_CACHE_MAX_SIZE:
+        for key in [k for k, (_, exp) in _SIGNED_TOKEN_CACHE.items() if exp <= now]:
+            del _SIGNED_TOKEN_CACHE[key]
+    _SIGNED_TOKEN_CACHE[cache_key] = (token, expires)
+    return token
 
 
 def _get_bearer_token(request: Request) -> str | None:
@@ -211,6 +449,19 @@ def _get_service_token_header(request: Request) -> str | None:
     return request.headers.get("X-Service-Token")
 
 
+def _peek_issuer(token: str) -> str | None:
+    """Read the iss claim without verifying the signature.
+
+    Only used to choose a verifier; the token is still fully verified.
+    """
+    try:
+        claims = jwt.decode(token, options={"verify_signature": False})
+    except jwt.PyJWTError:
+        return None
+    issuer = claims.get("iss")
+    return issuer if isinstance(issuer, str) else None
+
+
 def _get_firebase_cookie(request: Request) -> str | None:
     """Extract Firebase token from cookies (PRVID for practitioners)."""
     return request.cookies.get("PRVID") or request.cookies.get("PATID")
@@ -219,11 +470,10 @@ def _get_firebase_cookie(request: Request) -> str | None:
 async def get_current_user(request: Request) -> AuthenticatedUser:
     """Get the current authenticated user.
 
-    Supports multiple authentication methods:
-    1. Firebase ID token via Authorization Bearer header
-    2. Firebase ID token via cookie (PRVID/PATID)
-    3. Service JWT via Authorization Bearer header
-    4. Service JWT via X-Service-Token header
+    Supports multiple authentication methods, tried in this order:
+    1. Service JWT via X-Service-Token header
+    2. Firebase ID token or service JWT via Authorization Bearer header
+    3. Firebase ID token via cookie (PRVID/PATID)
 
     Args:
         request: The incoming FastAPI request
@@ -234,36 +484,8 @@ async def get_current_user(request: Request) -> AuthenticatedUser:
     Raises:
         HTTPException: If no valid authentication is found
     """
-    # Try Bearer token (could be Firebase or service token)
-    bearer_token = _get_bearer_token(request)
-    if bearer_token:
-        # Try Firebase first
-        try:
-            firebase_payload = verify_firebase_token(bearer_token)
-            return AuthenticatedUser(
-                auth_type="firebase",
-                user_id=firebase_payload.get("user_id"),
-                email=firebase_payload.get("email"),
-                raw_token=bearer_token,
-                firebase_payload=dict(firebase_payload),
-            )
-        except HTTPException:
-            pass  # Try service token
-
-        # Try service token
-        try:
-            service_payload = verify_service_token(bearer_token)
-            return AuthenticatedUser(
-                auth_type="service",
-                service_name=service_payload.service_name,
-                permissions=service_payload.permissions,
-                raw_token=bearer_token,
-                service_payload=service_payload,
-            )
-        except HTTPException:
-            pass  # Continue to other methods
-
-    # Try X-Service-Token header
+    # Try X-Service-Token header first: only service callers send it, so
+    # their requests never reach Firebase verification
     service_token = _get_service_token_header(request)
     if service_token:
         try:
@@ -278,6 +500,35 @@ async def get_current_user(request: Request) -> AuthenticatedUser:
         except HTTPException:
             pass
 
+    # Try Bearer token (could be Firebase or service token). The unverified
+    # issuer picks the one verifier that can accept it.
+    bearer_token = _get_bearer_token(request)
+    if bearer_token:
+        if _peek_issuer(bearer_token) == SERVICE_AUTH_ISSUER:
+            try:
+                service_payload = verify_service_token(bearer_token)
+                return AuthenticatedUser(
+                    auth_type="service",
+                    service_name=service_payload.service_name,
+                    permissions=service_payload.permissions,
+                    raw_token=bearer_token,
+                    service_payload=service_payload,
+                )
+            except HTTPException:
+                pass  # Continue to other methods
+        else:
+            try:
+                firebase_payload = verify_firebase_token(bearer_token)
+                return AuthenticatedUser(
+                    auth_type="firebase",
+                    user_id=firebase_payload.get("user_id"),
+                    email=firebase_payload.get("email"),
+                    raw_token=bearer_token,
+                    firebase_payload=firebase_payload,
+                )
+            except HTTPException:
+                pass  # Continue to other methods
+
     # Try Firebase cookie
     cookie_token = _get_firebase_cookie(request)
     if cookie_token:
@@ -288,7 +539,7 @@ async def get_current_user(request: Request) -> AuthenticatedUser:
                 user_id=firebase_payload.get("user_id"),
                 email=firebase_payload.get("email"),
                 raw_token=cookie_token,
-                firebase_payload=dict(firebase_payload),
+                firebase_payload=firebase_payload,
             )
         except HTTPException:
             pass
@@ -20,6 +20,11 @@ from defusedxml.ElementTree import ParseError, fromstring
 CDA_NS = "urn:hl7-org:v3"
 NAMESPACES = {"cda": CDA_NS}
 
+# Serialize the CDA namespace as the default namespace, so output keeps plain
+# element names instead of ns0: prefixes. The registry is process-global, so
+# this is done once at import rather than on every call.
+register_namespace("", CDA_NS)
+
 
 @dataclass
 class DoseRangeInfo:
@@ -39,14 +44,65 @@ NUMERIC_VALUE_ELEMENTS = [
     "quantity",
 ]
 
-# Pattern to detect non-numeric values (allows decimals and negative numbers)
-NUMERIC_PATTERN = re.compile(r"^-?\d+(\.\d+)?$")
-
-# Pattern to detect a range like "1-2" or "0.5-1"
-RANGE_PATTERN = re.compile(r"^(-?\d+(?:\.\d+)?)\s*-\s*(-?\d+(?:\.\d+)?)$")
 
-# Pattern to extract the first number from other non-numeric values
-FIRST_NUMBER_PATTERN = re.compile(r"^(-?\d+(?:\.\d+)?)")
+def _tags(local_name: str) -> frozenset[str]:
+    """Return the tag of a CDA element as parsed, with and without namespace."""
+    return frozenset((f"{{{CDA_NS}}}{local_name}", local_name))
+
+
+# Parsed tag -> local name for NUMERIC_VALUE_ELEMENTS, so elements are matched
+# by comparing tags directly instead of splitting off the namespace
+_NUMERIC_VALUE_TAGS = {
+    tag: name for name in NUMERIC_VALUE_ELEMENTS for tag in _tags(name)
+}
+
+# Ancestor of a doseQuantity that holds its medication
+_SUBSTANCE_ADMINISTRATION_TAGS = _tags("substanceAdministration")
+
+# Path from a substanceAdministration down to its medication code
+_MEDICATION_CODE_STEPS = (
+    "consumable",
+    "manufacturedProduct",
+    "manufacturedMaterial",
+    "code",
+)
+
+# substanceAdministration tag -> medication code path with the same (or no)
+# namespace. Exact tags let ElementPath compare with == instead of matching a
+# {*} wildcard suffix; it compiles and caches each path on first use.
+_MEDICATION_CODE_PATHS = {
+    f"{{{CDA_NS}}}substanceAdministration": "/".join(
+        f"{{{CDA_NS}}}{step}" for step in _MEDICATION_CODE_STEPS
+    ),
+    "substanceAdministration": "/".join(_MEDICATION_CODE_STEPS),
+}
+
+# Classifies a value attribute in one match (decimals and negatives allowed):
+# - num: already numeric
+# - low/high: a range like "1-2" or "0.5-1"
+# - first: the leading number of some other non-numeric value
+# No match means the value has no leading number at all.
+VALUE_PATTERN = re.compile(
+    r"^(?:"
+    r"(?P<num>-?\d+(?:\.\d+)?)$"
+    r"|(?P<low>-?\d+(?:\.\d+)?)\s*-\s*(?P<high>-?\d+(?:\.\d+)?)$"
+    r"|(?P<first>-?\d+(?:\.\d+)?)"
+    r")"
+)
+
+# Leading <?xml ...?> declaration, kept verbatim on re-serialization
+_XML_DECLARATION = re.compile(r"<\?xml[^?]*\?>")
+
+
+def _is_numeric(value: str) -> bool:
+    """Check for a plain decimal number such as "5" or "-1.5" without regex.
+
+    Agrees with VALUE_PATTERN's num group wherever it returns True, so it can
+    short-circuit the common case; anything else falls through to the regex.
+    """
+    digits = value[1:] if value.startswith("-") else value
+    whole, dot, fraction = digits.partition(".")
+    return whole.isdecimal() and (not dot or fraction.isdecimal())
 
 
 def sanitize_ccda(content: str) -> tuple[str, list[str], list[DoseRangeInfo]]:
@@ -67,25 +123,26 @@ def sanitize_ccda(content: str) -> tuple[str, list[str], list[DoseRangeInfo]]:
     dose_ranges: list[DoseRangeInfo] = []
 
     try:
-        # Register namespace to preserve it in output
-        register_namespace("", CDA_NS)
-
         root = fromstring(content)
 
         # Fix numeric value attributes
         fixes, ranges = _fix_numeric_value_attributes(root)
+        if not fixes:
+            # Nothing changed (the common case): hand back the original
+            # instead of building a second full copy by re-serializing
+            return content, warnings, dose_ranges
         warnings.extend(fixes)
         dose_ranges.extend(ranges)
 
         # Convert back to string
         sanitized = tostring(root, encoding="unicode")
 
-        # Restore XML declaration if present in original
-        if content.strip().startswith("<?xml"):
-            # Extract original declaration
-            decl_match = re.match(r"(<\?xml[^?]*\?>)", content)
-            if decl_match:
-                sanitized = decl_match.group(1) + "\n" + sanitized
+        # Restore the original XML declaration, if any. The parser only
+        # accepts one at the very start, so an anchored match finds it
+        # without stripping (copying) the whole document first.
+        decl_match = _XML_DECLARATION.match(content)
+        if decl_match:
+            sanitized = decl_match.group() + "\n" + sanitized
 
         return sanitized, warnings, dose_ranges
 
@@ -113,70 +170,78 @@ def _fix_numeric_value_attributes(
     warnings: list[str] = []
     dose_ranges: list[DoseRangeInfo] = []
 
-    # Build parent map for navigation
-    parent_map = {child: parent for parent in root.iter() for child in parent}
-
-    for element_name in NUMERIC_VALUE_ELEMENTS:
-        # Search with and without namespace
-        for elem in root.iter():
-            local_name = elem.tag.split("}")[-1] if "}" in elem.tag else elem.tag
-
-            if local_name == element_name:
-                value = elem.get("value")
-
-                if value is not None and not NUMERIC_PATTERN.match(value):
-                    original_value = value
-
-                    # Try to detect a range like "1-2" and use average
-                    range_match = RANGE_PATTERN.match(value)
-
-                    if range_match:
-                        low = float(range_match.group(1))
-                        high = float(range_match.group(2))
-                        avg = (low + high) / 2
-                        # Format nicely: use integer if whole number
-                        new_value = str(int(avg)) if avg == int(avg) else str(avg)
-                        elem.set("value", new_value)
-
-                        # Get unit if available
-                        unit = elem.get("unit")
-
-                        # Extract medication code for matching in FHIR post-processing
-                        medication_code = None
-                        if element_name == "doseQuantity":
-                            medication_code = _find_medication_code(elem, parent_map)
-                            dose_ranges.append(
-                                DoseRangeInfo(
-                                    low=low,
-                                    high=high,
-                                    unit=unit,
-                                    medication_code=medication_code,
-                                )
-                            )
-
-                        warnings.append(
-                            f"Sanitized {element_name}/@value: "
-                            f"'{original_value}' -> '{new_value}' (will use doseRange)"
+    # Parent map for navigating up from a doseQuantity; built on the first
+    # dose range, since most documents have none
+    parent_map: dict[Element, Element] | None = None
+
+    # Bound once: these are called for every candidate element
+    value_match = VALUE_PATTERN.match
+    numeric_value_tags = _NUMERIC_VALUE_TAGS
+    add_warning = warnings.append
+    add_dose_range = dose_ranges.append
+
+    # Single pass over the tree, with or without namespace on the tag
+    for elem in root.iter():
+        element_name = numeric_value_tags.get(elem.tag)
+        if element_name is None:
+            continue
+
+        value = elem.get("value")
+        if value is None or _is_numeric(value):
+            continue
+
+        parsed = value_match(value)
+        if parsed is None:
+            # Can't extract a number, use nullFlavor instead
+            del elem.attrib["value"]
+            elem.set("nullFlavor", "NI")
+            add_warning(
+                f"Sanitized {element_name}/@value: '{value}' -> nullFlavor='NI'"
+            )
+            continue
+
+        # One dispatch on which VALUE_PATTERN alternative matched
+        match parsed.lastgroup:
+            case "num":
+                continue
+
+            case "high":
+                # A range like "1-2" (lastgroup is the range's closing group,
+                # high): use the average
+                low = float(parsed["low"])
+                high = float(parsed["high"])
+                avg = (low + high) / 2
+                # Format nicely: use integer if whole number
+                new_value = str(int(avg)) if avg == int(avg) else str(avg)
+                elem.set("value", new_value)
+
+                # Extract medication code for matching in FHIR post-processing
+                if element_name == "doseQuantity":
+                    if parent_map is None:
+                        parent_map = {
+                            child: parent for parent in root.iter() for child in parent
+                        }
+                    add_dose_range(
+                        DoseRangeInfo(
+                            low=low,
+                            high=high,
+                            unit=elem.get("unit"),
+                            medication_code=_find_medication_code(elem, parent_map),
                         )
-                    else:
-                        # Try to extract first number from other non-numeric values
-                        match = FIRST_NUMBER_PATTERN.match(value)
-
-                        if match:
-                            new_value = match.group(1)
-                            elem.set("value", new_value)
-                            warnings.append(
-                                f"Sanitized {element_name}/@value: "
-                                f"'{original_value}' -> '{new_value}'"
-                            )
-                        else:
-                            # Can't extract a number, use nullFlavor instead
-                            del elem.attrib["value"]
-                            elem.set("nullFlavor", "NI")
-                            warnings.append(
-                                f"Sanitized {element_name}/@value: "
-                                f"'{original_value}' -> nullFlavor='NI'"
-                            )
+                    )
+
+                add_warning(
+                    f"Sanitized {element_name}/@value: "
+                    f"'{value}' -> '{new_value}' (will use doseRange)"
+                )
+
+            case "first":
+                # Extract the first number from other non-numeric values
+                new_value = parsed["first"]
+                elem.set("value", new_value)
+                add_warning(
+                    f"Sanitized {element_name}/@value: '{value}' -> '{new_value}'"
+                )
 
     return warnings, dose_ranges
 
@@ -196,8 +261,7 @@ def _find_medication_code(
 
     while current in parent_map:
         current = parent_map[current]
-        local_name = current.tag.split("}")[-1] if "}" in current.tag else current.tag
-        if local_name == "substanceAdministration":
+        if current.tag in _SUBSTANCE_ADMINISTRATION_TAGS:
             substance_admin = current
             break
 
@@ -205,16 +269,8 @@ def _find_medication_code(
         return None
 
     # Navigate down to find the medication code
-    # Path: consumable/manufacturedProduct/manufacturedMaterial/code
-    for consumable in substance_admin:
-        if consumable.tag.endswith("consumable"):
-            for mfg_product in consumable:
-                if mfg_product.tag.endswith("manufacturedProduct"):
-                    for mfg_material in mfg_product:
-                        if mfg_material.tag.endswith("manufacturedMaterial"):
-                            for code_elem in mfg_material:
-                                if code_elem.tag.endswith("code"):
-                                    code_value: str | None = code_elem.get("code")
-                                    return code_value
-
-    return None
+    code_elem = substance_admin.find(_MEDICATION_CODE_PATHS[substance_admin.tag])
+    if code_elem is None:
+        return None
+    code_value: str | None = code_elem.get("code")
+    return code_value
@@ -7,8 +7,11 @@ Parses appointment CSV files and extracts appointment data for import.
 import csv
 import io
 import re
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 from zoneinfo import ZoneInfo
 
@@ -42,12 +45,66 @@ class ParsedCharmAppointment:
     charm_record_id: str
 
 
-def parse_appointment_csv(csv_content: str) -> list[ParsedCharmAppointment]:
+# Month abbreviations as accepted by strptime's %b (case-insensitive)
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        "jan feb mar apr may jun jul aug sep oct nov dec".split(), start=1
+    )
+}
+
+# Charm's own formats, parsed without strptime: "26-Sep-44" for DOBs and
+# "1/22/26 12:00", "1/22/2026 12:00" or "1/22/26 12:00 PM" for appointments
+_CHARM_DOB_PATTERN = re.compile(r"(\d{1,2})-([A-Za-z]{3})-(\d{2})")
+_CHARM_DATETIME_PATTERN = re.compile(
+    r"(\d{1,2})/(\d{1,2})/(\d{2}|\d{4}) (\d{1,2}):(\d{2})(?: ([AP]M))?",
+    re.IGNORECASE,
+)
+
+
+# Charm gender values -> FHIR administrative gender
+_GENDER_MAP = {
+    "male": "male",
+    "m": "male",
+    "female": "female",
+    "f": "female",
+    "other": "other",
+    "unknown": "unknown",
+}
+
+# Everything but digits, stripped from phone numbers
+_NON_DIGIT = re.compile(r"\D")
+
+# Map common timezone names
+_TZ_MAP = {
+    "US/Pacific": "America/Los_Angeles",
+    "US/Eastern": "America/New_York",
+    "US/Central": "America/Chicago",
+    "US/Mountain": "America/Denver",
+    "PST": "America/Los_Angeles",
+    "EST": "America/New_York",
+    "CST": "America/Chicago",
+    "MST": "America/Denver",
+}
+
+# Used when a row's timezone is not recognised
+_DEFAULT_TZ = ZoneInfo("America/Los_Angeles")
+
+
+def _two_digit_year(year: int) -> int:
+    """Expand a 2-digit year the way strptime's %y does (69-99 -> 1900s)."""
+    return year + (1900 if year >= 69 else 2000)
+
+
+def parse_appointment_csv(
+    csv_content: str | Iterable[str],
+) -> list[ParsedCharmAppointment]:
     """
     Parse Charm appointment CSV content.
 
     Args:
-        csv_content: Raw CSV content as string
+        csv_content: Raw CSV content as string, or an iterable of its lines
+            (e.g. a text file opened with newline="")
 
     Returns:
         List of parsed appointments
@@ -55,69 +112,139 @@ def parse_appointment_csv(csv_content: str) -> list[ParsedCharmAppointment]:
     Raises:
         ValueError: If CSV is malformed or missing required fields
     """
-    appointments: list[ParsedCharmAppointment] = []
+    return list(iter_appointment_csv(csv_content))
+
+
+def iter_appointment_csv(
+    csv_content: str | Iterable[str],
+) -> Iterator[ParsedCharmAppointment]:
+    """
+    Parse Charm appointment CSV content one row at a time.
+
+    Streaming variant of parse_appointment_csv for consumers that process
+    appointments as they go instead of holding the whole list. Given lines
+    (such as a file), rows are read from them as they are parsed.
+
+    Args:
+        csv_content: Raw CSV content as string, or an iterable of its lines
+            (e.g. a text file opened with newline="")
 
-    reader = csv.DictReader(io.StringIO(csv_content))
+    Yields:
+        Parsed appointments, in file order
+
+    Raises:
+        ValueError: If CSV is malformed or missing required fields
+    """
+    # csv.reader tokenizes in C; rows stay as lists and are read by column
+    # position, avoiding DictReader's per-row dict. StringIO splits only on
+    # real line endings (str.splitlines also breaks on \x85, \u2028 etc.,
+    # which may appear inside fields).
+    lines = (
+        io.StringIO(csv_content, newline="")
+        if isinstance(csv_content, str)
+        else csv_content
+    )
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    # Column positions are resolved once per file. Each row gets one extra
+    # empty cell, which absent columns point at, so _cell indexes rows
+    # directly without per-cell membership or length checks.
+    width = len(header)
+    columns: dict[str, int] = defaultdict(lambda: width)
+    columns.update((name, i) for i, name in enumerate(header))
+
+    # Exports repeat the same DOBs (one patient, many visits) and slot times
+    # across rows, so each distinct value is parsed once per file
+    dobs: dict[str, Optional[date]] = {}
+    starts: dict[tuple[str, str], datetime] = {}
 
     for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
+        if not row:
+            continue  # Blank line, skipped like DictReader does
+        if len(row) != width:
+            row = (row + [""] * width)[:width]  # Ragged row: pad or trim
+        row.append("")
         try:
-            appointment = _parse_row(row)
-            appointments.append(appointment)
+            appointment = _parse_row(row, columns, dobs, starts)
         except ValueError as e:
             raise ValueError(f"Row {row_num}: {e}") from e
+        yield appointment
+
 
-    return appointments
+def _cell(row: list[str], columns: dict[str, int], name: str) -> str:
+    """Return the stripped value of a named column, or "" if absent."""
+    return row[columns[name]].strip()
 
 
-def _parse_row(row: dict[str, str]) -> ParsedCharmAppointment:
-    """Parse a single CSV row into a ParsedCharmAppointment."""
+def _parse_row(
+    row: list[str],
+    columns: dict[str, int],
+    dobs: dict[str, Optional[date]],
+    starts: dict[tuple[str, str], datetime],
+) -> ParsedCharmAppointment:
+    """
+    Parse a single CSV row into a ParsedCharmAppointment.
+
+    dobs and starts memoize parsed DOB and Date/Time values across the rows
+    of one file.
+    """
     # Required fields
-    patient_name = row.get("Patient Name", "").strip()
+    patient_name = _cell(row, columns, "Patient Name")
     if not patient_name:
         raise ValueError("Patient Name is required")
 
-    charm_appointment_id = row.get("Appointment ID", "").strip()
+    charm_appointment_id = _cell(row, columns, "Appointment ID")
     if not charm_appointment_id:
         raise ValueError("Appointment ID is required")
 
-    date_time_str = row.get("Date/Time", "").strip()
+    date_time_str = _cell(row, columns, "Date/Time")
     if not date_time_str:
         raise ValueError("Date/Time is required")
 
-    timezone_str = row.get("Timezone", "").strip() or "US/Pacific"
+    timezone_str = _cell(row, columns, "Timezone") or "US/Pacific"
 
     # Parse patient name
     given_name, family_name = _parse_patient_name(patient_name)
 
     # Parse date of birth
-    dob_str = row.get("DOB", "").strip()
-    birth_date = _parse_dob(dob_str) if dob_str else None
+    dob_str = _cell(row, columns, "DOB")
+    if not dob_str:
+        birth_date = None
+    elif dob_str in dobs:
+        birth_date = dobs[dob_str]
+    else:
+        birth_date = dobs[dob_str] = _parse_dob(dob_str)
 
     # Parse appointment datetime
-    start = _parse_datetime(date_time_str, timezone_str)
+    start_key = (date_time_str, timezone_str)
+    start = starts.get(start_key)
+    if start is None:
+        start = starts[start_key] = _parse_datetime(date_time_str, timezone_str)
 
     # Parse duration
-    duration_str = row.get("Duration(mins)", "").strip()
+    duration_str = _cell(row, columns, "Duration(mins)")
     duration_minutes = int(duration_str) if duration_str else 30
     end = start + timedelta(minutes=duration_minutes)
 
     # Parse gender
-    gender_str = row.get("Gender", "").strip().lower()
+    gender_str = _cell(row, columns, "Gender").lower()
     gender = _normalize_gender(gender_str) if gender_str else None
 
     # Parse phone - normalize to E.164 format
-    phone_str = row.get("Mobile Phone", "").strip()
+    phone_str = _cell(row, columns, "Mobile Phone")
     phone = _normalize_phone(phone_str) if phone_str else None
 
     # Parse appointment mode
-    appointment_mode = row.get("Appointment Mode", "").strip().lower()
+    appointment_mode = _cell(row, columns, "Appointment Mode").lower()
     is_virtual = appointment_mode in ("video consult", "phone call", "virtual")
 
     # Build address
-    address_line = row.get("Address", "").strip() or None
-    address_city = row.get("City", "").strip() or None
-    address_state = row.get("State", "").strip() or None
-    address_postal_code = row.get("Zip Code", "").strip() or None
+    address_line = _cell(row, columns, "Address") or None
+    address_city = _cell(row, columns, "City") or None
+    address_state = _cell(row, columns, "State") or None
+    address_postal_code = _cell(row, columns, "Zip Code") or None
 
     return ParsedCharmAppointment(
         given_name=given_name,
@@ -125,7 +252,7 @@ def _parse_row(row: dict[str, str]) -> ParsedCharmAppointment:
         birth_date=birth_date,
         gender=gender,
         phone=phone,
-        email=row.get("Email", "").strip() or None,
+        email=_cell(row, columns, "Email") or None,
         address_line=address_line,
         address_city=address_city,
         address_state=address_state,
@@ -133,11 +260,11 @@ def _parse_row(row: dict[str, str]) -> ParsedCharmAppointment:
         start=start,
         end=end,
         duration_minutes=duration_minutes,
-        visit_type=row.get("Visit Type", "").strip() or "Follow-up Visit",
+        visit_type=_cell(row, columns, "Visit Type") or "Follow-up Visit",
         is_virtual=is_virtual,
-        reason=row.get("Reason", "").strip() or None,
+        reason=_cell(row, columns, "Reason") or None,
         charm_appointment_id=charm_appointment_id,
-        charm_record_id=row.get("Record ID", "").strip() or "",
+        charm_record_id=_cell(row, columns, "Record ID") or "",
     )
 
 
@@ -150,7 +277,7 @@ def _parse_patient_name(full_name: str) -> tuple[str, str]:
         "John Smith" -> ("John", "Smith")
         "Mary Jane Watson" -> ("Mary Jane", "Watson")
     """
-    parts = full_name.strip().split()
+    parts = full_name.split()  # split() already drops surrounding whitespace
     if len(parts) == 1:
         return (parts[0], "")
     elif len(parts) == 2:
@@ -172,6 +299,20 @@ def _parse_dob(dob_str: str) -> Optional[date]:
 
     Uses 2-digit year logic: years 00-30 are 2000s, 31-99 are 1900s.
     """
+    # Fast path for the usual Charm format; anything unusual (including
+    # invalid dates) goes through strptime below
+    match = _CHARM_DOB_PATTERN.fullmatch(dob_str)
+    if match:
+        month = _MONTHS.get(match.group(2).lower())
+        if month is not None:
+            year = _two_digit_year(int(match.group(3)))
+            if year > datetime.now().year - 10:
+                year -= 100
+            try:
+                return date(year, month, int(match.group(1)))
+            except ValueError:
+                pass
+
     try:
         # Parse the date string
         parsed = datetime.strptime(dob_str, "%d-%b-%y")
@@ -206,6 +347,28 @@ def _parse_datetime(date_time_str: str, timezone_str: str) -> datetime:
     # Normalize timezone string
     tz = _parse_timezone(timezone_str)
 
+    # Fast path for Charm's formats; anything unusual (including invalid
+    # dates and times) goes through the strptime formats below
+    match = _CHARM_DATETIME_PATTERN.fullmatch(date_time_str)
+    if match:
+        month, day, year_str, hour_str, minute_str, meridiem = match.groups()
+        year = int(year_str)
+        hour = int(hour_str)
+        if len(year_str) == 2:
+            year = _two_digit_year(year)
+        elif year < 100:
+            year += 2000
+        # %p only pairs with 2-digit years and a 1-12 hour
+        if meridiem is None or (len(year_str) == 2 and 1 <= hour <= 12):
+            if meridiem is not None:
+                hour = hour % 12 + (12 if meridiem.upper() == "PM" else 0)
+            try:
+                return datetime(
+                    year, int(month), int(day), hour, int(minute_str), tzinfo=tz
+                )
+            except ValueError:
+                pass
+
     # Try various formats
     formats = [
         "%m/%d/%y %H:%M",  # "1/22/26 12:00"
@@ -230,40 +393,25 @@ def _parse_datetime(date_time_str: str, timezone_str: str) -> datetime:
     raise ValueError(f"Could not parse datetime: {date_time_str}")
 
 
+@lru_cache(maxsize=64)
 def _parse_timezone(timezone_str: str) -> ZoneInfo:
-    """Parse timezone string to ZoneInfo."""
-    # Map common timezone names
-    tz_map = {
-        "US/Pacific": "America/Los_Angeles",
-        "US/Eastern": "America/New_York",
-        "US/Central": "America/Chicago",
-        "US/Mountain": "America/Denver",
-        "PST": "America/Los_Angeles",
-        "EST": "America/New_York",
-        "CST": "America/Chicago",
-        "MST": "America/Denver",
-    }
-
-    tz_name = tz_map.get(timezone_str, timezone_str)
+    """Parse timezone string to ZoneInfo.
+
+    Cached per timezone string, since an export typically repeats one or two
+    timezones on every row.
+    """
+    tz_name = _TZ_MAP.get(timezone_str, timezone_str)
 
     try:
         return ZoneInfo(tz_name)
     except KeyError:
         # Default to Pacific if timezone is invalid
-        return ZoneInfo("America/Los_Angeles")
+        return _DEFAULT_TZ
 
 
 def _normalize_gender(gender_str: str) -> Optional[str]:
     """Normalize gender string to FHIR values."""
-    gender_map = {
-        "male": "male",
-        "m": "male",
-        "female": "female",
-        "f": "female",
-        "other": "other",
-        "unknown": "unknown",
-    }
-    return gender_map.get(gender_str.lower())
+    return _GENDER_MAP.get(gender_str.lower())
 
 
 def _normalize_phone(phone_str: str) -> Optional[str]:
@@ -275,8 +423,8 @@ def _normalize_phone(phone_str: str) -> Optional[str]:
         "(561) 132-5132" -> "+15611325132"
         "5611325132" -> "+15611325132"
     """
-    # Remove all non-digit characters
-    digits = re.sub(r"\D", "", phone_str)
+    # Remove all non-digit characters (already-bare numbers skip the regex)
+    digits = phone_str if phone_str.isdecimal() else _NON_DIGIT.sub("", phone_str)
 
     if not digits:
         return None
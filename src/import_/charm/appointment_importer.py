@@ -3,19 +3,26 @@ Appointment importer for Charm CSV exports.
 
 Orchestrates the appointment import flow:
 1. Parse CSV
-2. Match/create Person+Patient using PatientMatcher
-3. Look up organization's default Location
-4. Create FHIR Encounter with import tags
-5. Call Sentia API to create GCal event
+2. Look up organization's default Location
+3. Match/create Person+Patient using PatientMatcher
+4. Create FHIR Encounters with import tags, in one bundle
+5. Call Sentia API to create GCal events
 """
 
+import asyncio
 import base64
+import io
 import logging
+import time
+import uuid
+from collections import Counter, defaultdict
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from datetime import date
 from typing import Any, Optional
 from uuid import UUID
 
+import orjson
 from fhir_client.resources.location import Location
 
 from src.import_.charm.appointment_csv_parser import (
@@ -28,8 +35,9 @@ from src.import_.matching.patient_matcher import (
     PatientDemographics,
     PatientMatcher,
 )
-from src.services.fhir_store_service import FHIRStoreService
+from src.services.fhir_store_service import FHIRStoreService, PersistenceResult
 from src.services.sentia_service import SentiaService
+from src.utils.retry import retry_transient
 
 logger = logging.getLogger(__name__)
 
@@ -38,8 +46,41 @@ CHARM_APPOINTMENT_ID_SYSTEM = "https://charm.com/appointment-id"
 CHARM_RECORD_ID_SYSTEM = "https://charm.com/record-id"
 CONFIRMATION_STATUS_SYSTEM = "https://panova.ai/confirmation-status"
 
+# Encounter class coding by is_virtual. Shared between Encounters, never
+# mutated.
+_ENCOUNTER_CLASS: dict[bool, list[dict[str, Any]]] = {
+    is_virtual: [
+        {
+            "coding": [
+                {
+                    "system": "http://terminology.hl7.org/CodeSystem/v3-ActCode",
+                    "code": "VR" if is_virtual else "AMB",
+                }
+            ]
+        }
+    ]
+    for is_virtual in (False, True)
+}
+
+# meta.tag entries of every imported Encounter
+_ENCOUNTER_TAGS = (
+    {"system": IMPORT_SOURCE_TAG_SYSTEM, "code": CHARM_APPOINTMENTS_SOURCE},
+    {"system": CONFIRMATION_STATUS_SYSTEM, "code": "pending-import"},
+)
+
+# Organization ID -> (expiry, default Location), see _get_default_location
+_LOCATION_CACHE: dict[UUID, tuple[float, Location]] = {}
+_LOCATION_CACHE_TTL_SECONDS = 300
+
+# Appointments imported at once. Bounds in-flight FHIR/Sentia requests per CSV.
+MAX_CONCURRENT_APPOINTMENTS = 8
 
-@dataclass
+# Rows per Encounter bundle. Keeps each FHIR transaction bounded in size and
+# duration however large the CSV is.
+IMPORT_CHUNK_SIZE = 500
+
+
+@dataclass(slots=True)
 class AppointmentImportResult:
     """Result of importing a single appointment."""
 
@@ -51,9 +92,32 @@ class AppointmentImportResult:
     gcal_event_id: Optional[str] = None
     error: Optional[str] = None
     warnings: list[str] = field(default_factory=list)
+    # Not imported on purpose (needs manual resolution), rather than failed
+    skipped: bool = False
+
+    @property
+    def status(self) -> str:
+        """Tally bucket for this result: success, skipped or failed."""
+        if self.success:
+            return "success"
+        return "skipped" if self.skipped else "failed"
 
 
-@dataclass
+@dataclass(slots=True)
+class _PendingAppointment:
+    """An appointment whose patient is resolved, awaiting its Encounter."""
+
+    appointment: ParsedCharmAppointment
+    patient_id: UUID
+    person_id: Optional[UUID]
+    warnings: list[str]
+    # Bundle entry fullUrl, so the Encounter's ID can be found after persist
+    full_url: str = field(default_factory=lambda: f"urn:uuid:{uuid.uuid4()}")
+    encounter_id: Optional[UUID] = None
+    error: Optional[str] = None
+
+
+@dataclass(slots=True)
 class AppointmentImportResponse:
     """Response from appointment import operation."""
 
@@ -73,6 +137,8 @@ async def import_appointments_from_csv(
     sentia_service: SentiaService,
     auth_token: Optional[str] = None,
     service_token: Optional[str] = None,
+    max_concurrency: int = MAX_CONCURRENT_APPOINTMENTS,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
 ) -> AppointmentImportResponse:
     """
     Import appointments from Charm CSV export.
@@ -80,10 +146,9 @@ async def import_appointments_from_csv(
     Flow:
     1. Decode and parse CSV
     2. Look up organization's default Location
-    3. For each appointment row:
-       a. Match/create Person+Patient using PatientMatcher
-       b. Create FHIR Encounter with pending-import status
-       c. Call Sentia API to create GCal event
+    3. Match/create Person+Patient for each row using PatientMatcher
+    4. Create FHIR Encounters with pending-import status, in one bundle
+    5. Call Sentia API to create a GCal event for each row
 
     Args:
         csv_data_base64: Base64-encoded CSV data
@@ -92,21 +157,72 @@ async def import_appointments_from_csv(
         fhir_store: FHIR store service for persistence
         sentia_service: Sentia service for GCal event creation
         auth_token: Firebase auth token for Sentia API calls
+        max_concurrency: Maximum number of appointments imported at once
+        chunk_size: Number of rows whose Encounters are created per bundle
 
     Returns:
         AppointmentImportResponse with counts and results
     """
-    results: list[AppointmentImportResult] = []
-    warnings: list[str] = []
-
-    # Decode and parse CSV
     try:
-        csv_content = base64.b64decode(csv_data_base64).decode("utf-8")
+        csv_bytes = base64.b64decode(csv_data_base64)
     except Exception as e:
         raise ValueError(f"Failed to decode CSV data: {e}") from e
 
+    # Decoded line by line as the parser reads, without a full str copy
+    csv_lines = io.TextIOWrapper(io.BytesIO(csv_bytes), encoding="utf-8", newline="")
+
+    return await import_appointments_from_csv_content(
+        csv_content=csv_lines,
+        organization_id=organization_id,
+        practitioner_role_id=practitioner_role_id,
+        fhir_store=fhir_store,
+        sentia_service=sentia_service,
+        auth_token=auth_token,
+        service_token=service_token,
+        max_concurrency=max_concurrency,
+        chunk_size=chunk_size,
+    )
+
+
+async def import_appointments_from_csv_content(
+    csv_content: str | Iterable[str],
+    organization_id: UUID,
+    practitioner_role_id: UUID,
+    fhir_store: FHIRStoreService,
+    sentia_service: SentiaService,
+    auth_token: Optional[str] = None,
+    service_token: Optional[str] = None,
+    max_concurrency: int = MAX_CONCURRENT_APPOINTMENTS,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> AppointmentImportResponse:
+    """
+    Import appointments from already-decoded Charm CSV text.
+
+    Used directly by the multipart upload endpoint, which receives the raw
+    file and has no base64 layer to strip.
+
+    Args:
+        csv_content: CSV text including the header row, or an iterable of its
+            lines (e.g. a text file opened with newline="")
+        organization_id: Target organization ID
+        practitioner_role_id: PractitionerRole ID for encounter participant
+        fhir_store: FHIR store service for persistence
+        sentia_service: Sentia service for GCal event creation
+        auth_token: Firebase auth token for Sentia API calls
+        service_token: Service token for Sentia API calls
+        max_concurrency: Maximum number of appointments imported at once
+        chunk_size: Number of rows whose Encounters are created per bundle
+
+    Returns:
+        AppointmentImportResponse with counts and results
+    """
+    warnings: list[str] = []
+
     try:
         appointments = parse_appointment_csv(csv_content)
+    except UnicodeDecodeError as e:
+        # Streamed input is only decoded as it is parsed
+        raise ValueError(f"Failed to decode CSV data: {e}") from e
     except ValueError as e:
         raise ValueError(f"Failed to parse CSV: {e}") from e
 
@@ -131,65 +247,130 @@ async def import_appointments_from_csv(
 
     # Initialize patient matcher
     matcher = PatientMatcher(fhir_store.client)
+    location_id = default_location.id
+    location_timezone = default_location.timezone or "America/Los_Angeles"
 
-    # Process each appointment
-    successful = 0
-    failed = 0
-    skipped = 0
+    # Practitioner, location and organization references are the same for
+    # every Encounter; only the patient reference varies per row
+    references = _encounter_references(
+        organization_id, practitioner_role_id, location_id
+    )
 
-    for appointment in appointments:
-        result = await _import_single_appointment(
-            appointment=appointment,
+    # Rows run concurrently, bounded by the semaphore
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    # Phase 1: match patients. Rows for the same patient still run one at a
+    # time, so a patient first seen in this CSV is created once and matched
+    # by the rows after it.
+    patient_locks: defaultdict[tuple[str, str, Optional[date]], asyncio.Lock] = (
+        defaultdict(asyncio.Lock)
+    )
+
+    async def match_one(
+        appointment: ParsedCharmAppointment,
+        validated: PatientDemographics | AppointmentImportResult,
+    ) -> AppointmentImportResult | _PendingAppointment:
+        if isinstance(validated, AppointmentImportResult):
+            return validated  # Rejected before any network call
+        patient_key = (
+            appointment.given_name.casefold(),
+            appointment.family_name.casefold(),
+            appointment.birth_date,
+        )
+        async with patient_locks[patient_key], semaphore:
+            return await _match_patient(
+                appointment, validated, organization_id, matcher
+            )
+
+    # Phase 3: create GCal events, the only per-row calls left
+    async def finish_one(
+        item: AppointmentImportResult | _PendingAppointment,
+    ) -> AppointmentImportResult:
+        if isinstance(item, AppointmentImportResult):
+            return item  # Failed matching
+        async with semaphore:
+            return await _finish_import(
+                item,
+                practitioner_role_id=practitioner_role_id,
+                location_id=location_id,
+                location_timezone=location_timezone,
+                sentia_service=sentia_service,
+                auth_token=auth_token,
+                service_token=service_token,
+            )
+
+    # Rows go through the phases chunk_size at a time, bounding each
+    # Encounter transaction. gather keeps rows in CSV order.
+    # Phase 0: validate every row up front (pure CPU), so rejected rows never
+    # hold a concurrency slot or reach FHIR
+    validated = [_validate_appointment(a) for a in appointments]
+
+    results: list[AppointmentImportResult] = []
+    for chunk_start in range(0, len(appointments), chunk_size):
+        chunk = slice(chunk_start, chunk_start + chunk_size)
+        matched = await asyncio.gather(
+            *map(match_one, appointments[chunk], validated[chunk])
+        )
+
+        # Phase 2: create the chunk's Encounters in one FHIR bundle
+        await _create_import_encounters(
+            pending=[m for m in matched if isinstance(m, _PendingAppointment)],
             organization_id=organization_id,
-            practitioner_role_id=practitioner_role_id,
-            location_id=default_location.id,
-            location_timezone=default_location.timezone or "America/Los_Angeles",
-            matcher=matcher,
+            references=references,
             fhir_store=fhir_store,
-            sentia_service=sentia_service,
-            auth_token=auth_token,
-            service_token=service_token,
         )
 
-        results.append(result)
-        if result.success:
-            successful += 1
-        elif result.error and "skipped" in result.error.lower():
-            skipped += 1
-        else:
-            failed += 1
+        results.extend(await asyncio.gather(*(finish_one(m) for m in matched)))
 
-        # Add per-appointment warnings to global warnings
+    counts = Counter(result.status for result in results)
+
+    # Add per-appointment warnings to global warnings
+    for result in results:
         warnings.extend(result.warnings)
 
     return AppointmentImportResponse(
         total_rows=len(appointments),
-        successful=successful,
-        failed=failed,
-        skipped=skipped,
+        successful=counts["success"],
+        failed=counts["failed"],
+        skipped=counts["skipped"],
         results=results,
         warnings=warnings,
     )
 
 
-async def _import_single_appointment(
+def _validate_appointment(
+    appointment: ParsedCharmAppointment,
+) -> PatientDemographics | AppointmentImportResult:
+    """
+    Check an appointment before import and map it to matching demographics.
+
+    Returns the demographics, or a failed result for a row that could only
+    fail against FHIR.
+    """
+    # A zero-length Encounter (start == end) is valid; only a negative
+    # duration would end it before it starts
+    if appointment.duration_minutes < 0:
+        return AppointmentImportResult(
+            success=False,
+            charm_appointment_id=appointment.charm_appointment_id,
+            error=f"Invalid duration: {appointment.duration_minutes} minutes",
+        )
+    return _to_patient_demographics(appointment)
+
+
+async def _match_patient(
     appointment: ParsedCharmAppointment,
+    demographics: PatientDemographics,
     organization_id: UUID,
-    practitioner_role_id: UUID,
-    location_id: UUID,
-    location_timezone: str,
     matcher: PatientMatcher,
-    fhir_store: FHIRStoreService,
-    sentia_service: SentiaService,
-    auth_token: Optional[str],
-    service_token: Optional[str] = None,
-) -> AppointmentImportResult:
-    """Import a single appointment."""
-    warnings: list[str] = []
+) -> AppointmentImportResult | _PendingAppointment:
+    """
+    Match or create the patient for an appointment.
 
+    Returns the appointment pending its Encounter, or a failed result if the
+    patient could not be resolved.
+    """
     try:
-        # Step 1: Match or create patient
-        demographics = _to_patient_demographics(appointment)
         match_result = await matcher.match_or_create(demographics, organization_id)
 
         if match_result.status == MatchStatus.MULTIPLE_MATCHES:
@@ -198,6 +379,7 @@ async def _import_single_appointment(
                 charm_appointment_id=appointment.charm_appointment_id,
                 error="Multiple patient matches found - manual resolution required",
                 warnings=match_result.warnings or [],
+                skipped=True,
             )
 
         if match_result.status == MatchStatus.MATCH_FAILED:
@@ -210,54 +392,16 @@ async def _import_single_appointment(
 
         assert match_result.patient_id is not None
 
+        warnings: list[str] = []
         if match_result.patient_created:
             warnings.append(
                 f"Created new patient {match_result.patient_id} for {appointment.given_name} {appointment.family_name}"
             )
 
-        # Step 2: Create FHIR Encounter
-        encounter_id = await _create_import_encounter(
+        return _PendingAppointment(
             appointment=appointment,
             patient_id=match_result.patient_id,
-            organization_id=organization_id,
-            practitioner_role_id=practitioner_role_id,
-            location_id=location_id,
-            fhir_store=fhir_store,
-        )
-
-        # Step 3: Call Sentia to create GCal event (if auth_token or service_token provided)
-        gcal_event_id: Optional[str] = None
-        if auth_token or service_token:
-            try:
-                gcal_result = await sentia_service.create_imported_appointment(
-                    auth_token=auth_token,
-                    encounter_id=encounter_id,
-                    patient_id=match_result.patient_id,
-                    practitioner_role_id=practitioner_role_id,
-                    location_id=location_id,
-                    start=appointment.start,
-                    end=appointment.end,
-                    reason=appointment.reason or appointment.visit_type,
-                    is_virtual=appointment.is_virtual,
-                    timezone=location_timezone,
-                    service_token=service_token,
-                )
-                gcal_event_id = gcal_result.gcal_event_id
-                if gcal_result.warnings:
-                    warnings.extend(gcal_result.warnings)
-            except Exception as e:
-                warnings.append(f"Failed to create GCal event: {e}")
-                # Continue - encounter is still created
-        else:
-            warnings.append("Skipped GCal event creation (no auth token)")
-
-        return AppointmentImportResult(
-            success=True,
-            charm_appointment_id=appointment.charm_appointment_id,
-            patient_id=match_result.patient_id,
             person_id=match_result.person_id,
-            encounter_id=encounter_id,
-            gcal_event_id=gcal_event_id,
             warnings=warnings,
         )
 
@@ -269,9 +413,70 @@ async def _import_single_appointment(
             success=False,
             charm_appointment_id=appointment.charm_appointment_id,
             error=str(e),
+        )
+
+
+async def _finish_import(
+    item: _PendingAppointment,
+    practitioner_role_id: UUID,
+    location_id: UUID,
+    location_timezone: str,
+    sentia_service: SentiaService,
+    auth_token: Optional[str],
+    service_token: Optional[str] = None,
+) -> AppointmentImportResult:
+    """Create the GCal event for an appointment and build its result."""
+    appointment = item.appointment
+    warnings = item.warnings
+
+    if item.encounter_id is None:
+        return AppointmentImportResult(
+            success=False,
+            charm_appointment_id=appointment.charm_appointment_id,
+            error=item.error or "Encounter was not created",
             warnings=warnings,
         )
 
+    # Call Sentia to create GCal event (if auth_token or service_token provided)
+    gcal_event_id: Optional[str] = None
+    if auth_token or service_token:
+        try:
+            encounter_id = item.encounter_id
+            # Rate-limited or unavailable responses are retried with backoff
+            gcal_result = await retry_transient(
+                lambda: sentia_service.create_imported_appointment(
+                    auth_token=auth_token,
+                    encounter_id=encounter_id,
+                    patient_id=item.patient_id,
+                    practitioner_role_id=practitioner_role_id,
+                    location_id=location_id,
+                    start=appointment.start,
+                    end=appointment.end,
+                    reason=appointment.reason or appointment.visit_type,
+                    is_virtual=appointment.is_virtual,
+                    timezone=location_timezone,
+                    service_token=service_token,
+                )
+            )
+            gcal_event_id = gcal_result.gcal_event_id
+            if gcal_result.warnings:
+                warnings.extend(gcal_result.warnings)
+        except Exception as e:
+            warnings.append(f"Failed to create GCal event: {e}")
+            # Continue - encounter is still created
+    else:
+        warnings.append("Skipped GCal event creation (no auth token)")
+
+    return AppointmentImportResult(
+        success=True,
+        charm_appointment_id=appointment.charm_appointment_id,
+        patient_id=item.patient_id,
+        person_id=item.person_id,
+        encounter_id=item.encounter_id,
+        gcal_event_id=gcal_event_id,
+        warnings=warnings,
+    )
+
 
 def _to_patient_demographics(
     appointment: ParsedCharmAppointment,
@@ -294,7 +499,17 @@ def _to_patient_demographics(
 async def _get_default_location(
     fhir_store: FHIRStoreService, organization_id: UUID
 ) -> Optional[Location]:
-    """Get the default (first) location for an organization."""
+    """
+    Get the default (first) location for an organization.
+
+    Found locations are cached for _LOCATION_CACHE_TTL_SECONDS, since an
+    organization's locations rarely change between imports. A miss is not
+    cached, so a newly added location is picked up on the next import.
+    """
+    cached = _LOCATION_CACHE.get(organization_id)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
     # Search for locations in this organization
     # Note: Not filtering by status since many locations don't have it set
     search_params = {
@@ -308,99 +523,92 @@ async def _get_default_location(
         params=search_params,
     )
     response.raise_for_status()
-    data = response.json()
+    data = orjson.loads(response.content)
 
     entries = data.get("entry", [])
     if entries:
         resource = entries[0].get("resource", {})
         if resource.get("resourceType") == "Location":
-            return Location(**resource)
+            location = Location(**resource)
+            _LOCATION_CACHE[organization_id] = (
+                time.monotonic() + _LOCATION_CACHE_TTL_SECONDS,
+                location,
+            )
+            return location
 
     return None
 
 
-async def _create_import_encounter(
-    appointment: ParsedCharmAppointment,
-    patient_id: UUID,
+async def _create_import_encounters(
+    pending: list[_PendingAppointment],
     organization_id: UUID,
-    practitioner_role_id: UUID,
-    location_id: UUID,
+    references: dict[str, Any],
     fhir_store: FHIRStoreService,
-) -> UUID:
-    """Create a FHIR Encounter for the imported appointment."""
-    # Determine encounter class based on virtual flag
-    encounter_class = "VR" if appointment.is_virtual else "AMB"
-
-    encounter: dict[str, Any] = {
-        "resourceType": "Encounter",
-        "status": "planned",
-        "plannedStartDate": appointment.start.isoformat(),
-        "plannedEndDate": appointment.end.isoformat(),
-        "actualPeriod": {
-            "start": appointment.start.isoformat(),
-            "end": appointment.end.isoformat(),
-        },
-        "subject": {"reference": f"Patient/{patient_id}"},
-        "participant": [
-            {"actor": {"reference": f"PractitionerRole/{practitioner_role_id}"}}
-        ],
-        "location": [{"location": {"reference": f"Location/{location_id}"}}],
-        "serviceProvider": {"reference": f"Organization/{organization_id}"},
-        "class": [
-            {
-                "coding": [
-                    {
-                        "system": "http://terminology.hl7.org/CodeSystem/v3-ActCode",
-                        "code": encounter_class,
-                    }
-                ]
-            }
-        ],
-        "reason": [
-            {
-                "value": [
-                    {"concept": {"text": appointment.reason or appointment.visit_type}}
-                ]
-            }
-        ],
-        "identifier": [
-            {
-                "system": CHARM_APPOINTMENT_ID_SYSTEM,
-                "value": appointment.charm_appointment_id,
-            },
-        ],
-        "meta": {
-            "tag": [
-                {"system": IMPORT_SOURCE_TAG_SYSTEM, "code": CHARM_APPOINTMENTS_SOURCE},
-                {"system": CONFIRMATION_STATUS_SYSTEM, "code": "pending-import"},
-            ]
-        },
-    }
+) -> None:
+    """
+    Create the FHIR Encounters for matched appointments in one bundle.
+
+    references are the import's shared Encounter references, from
+    _encounter_references. Sets encounter_id (or error) on each pending
+    appointment. The bundle is persisted as a single transaction. If the
+    server rejects it (4xx), nothing was committed, so each Encounter is
+    retried on its own and one bad row does not fail the rest. Any other
+    failure (transport error, 5xx) leaves the outcome unknown, so the whole
+    chunk is marked failed rather than risking duplicate Encounters.
+    """
+    if not pending:
+        return
 
-    # Add Charm record ID if available
-    if appointment.charm_record_id:
-        encounter["identifier"].append(
-            {
-                "system": CHARM_RECORD_ID_SYSTEM,
-                "value": appointment.charm_record_id,
-            }
+    failure = await _persist_encounters(
+        pending, organization_id, references, fhir_store
+    )
+    if failure is None:
+        return
+
+    error = f"Failed to create encounter: {failure.errors}"
+    if len(pending) == 1 or not failure.rejected:
+        for item in pending:
+            item.error = error
+        return
+
+    logger.warning(
+        "Batched creation of %d encounters was rejected, retrying individually: %s",
+        len(pending),
+        error,
+    )
+    for item in pending:
+        failure = await _persist_encounters(
+            [item], organization_id, references, fhir_store
         )
+        if failure is not None:
+            item.error = f"Failed to create encounter: {failure.errors}"
 
-    # Generate a UUID for fullUrl tracking
-    import uuid as uuid_module
 
-    encounter_uuid = uuid_module.uuid4()
+async def _persist_encounters(
+    items: list[_PendingAppointment],
+    organization_id: UUID,
+    references: dict[str, Any],
+    fhir_store: FHIRStoreService,
+) -> Optional[PersistenceResult]:
+    """
+    Persist the Encounters for items in one bundle.
 
-    # Create a bundle with just this encounter
-    # Include fullUrl so the ID mapping is populated after persist
+    Returns:
+        The failed PersistenceResult if the bundle failed as a whole, None
+        otherwise. Per-item failures are recorded on the item.
+    """
+    # Each entry's fullUrl keys its created ID in the persist id_mapping
     bundle: dict[str, Any] = {
         "resourceType": "Bundle",
         "type": "collection",
         "entry": [
             {
-                "fullUrl": f"urn:uuid:{encounter_uuid}",
-                "resource": encounter,
+                "fullUrl": item.full_url,
+                "resource": _build_encounter_resource(
+                    item.appointment, item.patient_id, references
+                ),
             }
+            for item in items
         ],
     }
 
@@ -408,9 +616,8 @@ async def _create_import_encounter(
     result = await fhir_store.persist_bundle(bundle, organization_id)
 
     if not result.success:
-        raise ValueError(f"Failed to create encounter: {result.errors}")
+        return result
 
-    # Extract the created encounter ID from the id_mapping
     logger.info(
         "persist_bundle result: success=%s, created=%s, id_mapping=%s",
         result.success,
@@ -418,16 +625,86 @@ async def _create_import_encounter(
         result.id_mapping,
     )
 
-    for full_url, resource_id in result.id_mapping.items():
-        logger.info(
-            "Extracting encounter ID from full_url=%s, resource_id=%s",
-            full_url,
-            resource_id,
-        )
+    for item in items:
+        resource_id = result.id_mapping.get(item.full_url)
+        if resource_id is None:
+            item.error = "Encounter created but ID not returned"
+            continue
         try:
-            return UUID(resource_id)
+            item.encounter_id = UUID(resource_id)
         except ValueError as e:
             logger.error("Failed to parse resource_id '%s' as UUID: %s", resource_id, e)
-            raise ValueError(f"Invalid encounter ID format: {resource_id}") from e
+            item.error = f"Invalid encounter ID format: {resource_id}"
+
+    return None
+
+
+def _encounter_references(
+    organization_id: UUID,
+    practitioner_role_id: UUID,
+    location_id: UUID,
+) -> dict[str, Any]:
+    """
+    Build the Encounter reference fields shared by every row of an import.
+
+    Built once per import and shared (never mutated) by its Encounters.
+    """
+    return {
+        "participant": [
+            {"actor": {"reference": f"PractitionerRole/{practitioner_role_id}"}}
+        ],
+        "location": [{"location": {"reference": f"Location/{location_id}"}}],
+        "serviceProvider": {"reference": f"Organization/{organization_id}"},
+    }
 
-    raise ValueError("Encounter created but ID not returned")
+
+def _build_encounter_resource(
+    appointment: ParsedCharmAppointment,
+    patient_id: UUID,
+    references: dict[str, Any],
+) -> dict[str, Any]:
+    """
+    Build the FHIR Encounter for an imported appointment.
+
+    references (from _encounter_references) and the class coding are shared
+    between the Encounters of an import rather than rebuilt per row.
+    """
+    start = appointment.start.isoformat()
+    end = appointment.end.isoformat()
+
+    identifiers = [
+        {
+            "system": CHARM_APPOINTMENT_ID_SYSTEM,
+            "value": appointment.charm_appointment_id,
+        },
+    ]
+    # Add Charm record ID if available
+    if appointment.charm_record_id:
+        identifiers.append(
+            {
+                "system": CHARM_RECORD_ID_SYSTEM,
+                "value": appointment.charm_record_id,
+            }
+        )
+
+    return {
+        "resourceType": "Encounter",
+        "status": "planned",
+        "plannedStartDate": start,
+        "plannedEndDate": end,
+        "actualPeriod": {"start": start, "end": end},
+        "subject": {"reference": f"Patient/{patient_id}"},
+        **references,
+        # Encounter class based on virtual flag
+        "class": _ENCOUNTER_CLASS[appointment.is_virtual],
+        "reason": [
+            {
+                "value": [
+                    {"concept": {"text": appointment.reason or appointment.visit_type}}
+                ]
+            }
+        ],
+        "identifier": identifiers,
+        # Per resource: persist_bundle adds the organization tag in place
+        "meta": {"tag": [dict(tag) for tag in _ENCOUNTER_TAGS]},
+    }
@@ -5,7 +5,10 @@ Converts extracted clinical notes (HPI, Past Medical History, etc.) into
 FHIR Composition resources with proper sections and linking to Encounters.
 """
 
+import re
+from collections import defaultdict
 from datetime import date
+from functools import lru_cache
 from typing import Any
 from uuid import uuid4
 
@@ -20,6 +23,13 @@ SOAP_LOINC_CODES = {
     "Additional": {"code": "48767-8", "display": "Annotation comment"},
 }
 
+# LOINC coding list per SOAP section. Shared by every section of that type,
+# like PROGRESS_NOTE_TYPE, and never mutated.
+_SOAP_CODING = {
+    soap_section: [{"system": "http://loinc.org", **loinc_info}]
+    for soap_section, loinc_info in SOAP_LOINC_CODES.items()
+}
+
 # Map C-CDA note types to SOAP sections
 NOTE_TYPE_TO_SOAP = {
     # Subjective section
@@ -52,6 +62,59 @@ NOTE_TYPE_TO_SOAP = {
     "allergies": "Additional",
 }
 
+# Resource types whose references Compositions point at
+_REFERENCED_RESOURCE_TYPES = ("Patient", "Practitioner", "Organization")
+
+# Patterns for _html_to_markdown, compiled once rather than per note
+_HTML_TAG = re.compile(r"<[^>]+>")
+_MULTIPLE_SPACES = re.compile(r" {2,}")
+_EXCESS_NEWLINES = re.compile(r"\n{3,}")
+
+# Common clinical section headers that should start on new lines, applied in
+# this order
+_SECTION_HEADERS = tuple(
+    re.compile(rf"(?<!\n)({header})", re.IGNORECASE)
+    for header in (
+        r"Past Psychiatric History",
+        r"Psychiatric Diagnoses/Course of Illness",
+        r"Hx of Psychotherapy",
+        r"Hospitalizations",
+        r"History of Suicide Attempts\??",
+        r"History of Self-harm\??",
+        r"History of Trauma\??",
+        r"Past Psychiatric Medication Trials",
+        r"Past Meds Tried:",
+        r"Past Medical History:?",
+        r"Medical Conditions",
+        r"Other Physicians Seen Regularly",
+        r"Current Medications",
+        r"Current Psychiatric Medications",
+        r"Therapy performed",
+        r"Mental Status Exam:?",
+        r"MSE:?",
+        r"Assessment:?",
+        r"Plan:?",
+        r"Diagnoses:?",
+        r"Outpatient Hx:",
+    )
+)
+
+# English month names for Composition titles, independent of the locale
+_MONTH_NAMES = (
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+)
+
 # Progress note type
 PROGRESS_NOTE_TYPE = {
     "system": "http://loinc.org",
@@ -59,6 +122,23 @@ PROGRESS_NOTE_TYPE = {
     "display": "Progress note",
 }
 
+# Constant part of every Composition, copied per Composition. The None
+# placeholders fix the key order; the shared "type" is never mutated.
+_COMPOSITION_PROTOTYPE: dict[str, Any] = {
+    "resourceType": "Composition",
+    "id": None,
+    "status": "final",
+    "type": {
+        "coding": [PROGRESS_NOTE_TYPE],
+        "text": "Progress note",
+    },
+    "subject": None,
+    "encounter": None,
+    "date": None,
+    "title": None,
+    "section": None,
+}
+
 
 def build_compositions(
     fhir_bundle: dict[str, Any],
@@ -79,112 +159,127 @@ def build_compositions(
     Returns:
         Tuple of (modified bundle, warnings)
     """
+    if not extraction_result.notes:
+        # Nothing to build; skip scanning the bundle for references
+        return fhir_bundle, ["No clinical notes to build Compositions from"]
+
     warnings: list[str] = []
 
     # Get references from bundle
-    patient_ref = _find_patient_reference(fhir_bundle)
-    practitioner_ref = _find_practitioner_reference(fhir_bundle)
-    organization_ref = _find_organization_reference(fhir_bundle)
+    refs = _index_references(fhir_bundle)
+    patient_ref = refs["Patient"]
+    practitioner_ref = refs["Practitioner"]
+    organization_ref = refs["Organization"]
 
     if not patient_ref:
         warnings.append("Cannot create Compositions: no Patient reference found")
         return fhir_bundle, warnings
 
     # Group notes by date
-    notes_by_date: dict[date, list[ClinicalNote]] = {}
+    notes_by_date: defaultdict[date, list[ClinicalNote]] = defaultdict(list)
     for note in extraction_result.notes:
-        if note.date not in notes_by_date:
-            notes_by_date[note.date] = []
         notes_by_date[note.date].append(note)
 
-    # Create a Composition for each encounter date that has notes
-    composition_entries: list[dict[str, Any]] = []
-
-    for note_date, notes in sorted(notes_by_date.items()):
-        encounter_ref = encounter_date_to_ref.get(note_date)
-        if not encounter_ref:
-            warnings.append(f"No encounter found for notes dated {note_date}")
-            continue
+    dated_notes = sorted(notes_by_date.items())
+    warnings.extend(
+        f"No encounter found for notes dated {note_date}"
+        for note_date, _ in dated_notes
+        if not encounter_date_to_ref.get(note_date)
+    )
 
-        composition, full_url = _create_composition(
+    # Create a Composition for each encounter date that has notes. Section
+    # values are memoized for this call only, so note text (PHI) is not kept
+    # once the bundle is built.
+    prototype = _bundle_prototype(patient_ref, practitioner_ref, organization_ref)
+    section_values: dict[tuple[str, str], tuple[str, str]] = {}
+    compositions = [
+        _create_composition(
             notes=notes,
             note_date=note_date,
-            patient_ref=patient_ref,
-            practitioner_ref=practitioner_ref,
-            organization_ref=organization_ref,
+            prototype=prototype,
             encounter_ref=encounter_ref,
+            section_values=section_values,
         )
+        for note_date, notes in dated_notes
+        if (encounter_ref := encounter_date_to_ref.get(note_date))
+    ]
+    composition_entries = [
+        {"fullUrl": full_url, "resource": composition}
+        for composition, full_url in compositions
+    ]
 
-        composition_entries.append({"fullUrl": full_url, "resource": composition})
-
-    # Add Compositions to the bundle
-    existing_entries = fhir_bundle.get("entry", [])
-    fhir_bundle["entry"] = existing_entries + composition_entries
+    # Add Compositions to the bundle in place rather than copying every entry
+    fhir_bundle.setdefault("entry", []).extend(composition_entries)
 
     warnings.append(f"Created {len(composition_entries)} Composition resources")
 
     return fhir_bundle, warnings
 
 
-def _find_patient_reference(bundle: dict[str, Any]) -> str | None:
-    """Find the Patient resource reference in the bundle."""
-    for entry in bundle.get("entry", []):
-        resource = entry.get("resource", {})
-        if resource.get("resourceType") == "Patient":
-            # Prefer fullUrl for transaction bundle compatibility
-            # GCP FHIR API resolves urn:uuid references within transaction bundles
-            full_url: str | None = entry.get("fullUrl")
-            if full_url and full_url.startswith("urn:uuid:"):
-                return full_url
-            patient_id = resource.get("id")
-            if patient_id:
-                return f"Patient/{patient_id}"
-            if full_url:
-                return full_url
-    return None
-
-
-def _find_practitioner_reference(bundle: dict[str, Any]) -> str | None:
-    """Find a Practitioner resource reference in the bundle."""
-    for entry in bundle.get("entry", []):
-        resource = entry.get("resource", {})
-        if resource.get("resourceType") == "Practitioner":
-            # Prefer fullUrl for transaction bundle compatibility
-            full_url: str | None = entry.get("fullUrl")
-            if full_url and full_url.startswith("urn:uuid:"):
-                return full_url
-            pract_id = resource.get("id")
-            if pract_id:
-                return f"Practitioner/{pract_id}"
-            if full_url:
-                return full_url
-    return None
-
-
-def _find_organization_reference(bundle: dict[str, Any]) -> str | None:
-    """Find an Organization resource reference in the bundle."""
+def _index_references(bundle: dict[str, Any]) -> dict[str, str | None]:
+    """
+    Find the Patient, Practitioner and Organization references in the bundle.
+
+    One pass over the entries, stopping once every type is found; each type
+    gets the first entry of that type that yields a reference.
+    """
+    refs: dict[str, str | None] = dict.fromkeys(_REFERENCED_RESOURCE_TYPES)
+    missing = len(refs)
     for entry in bundle.get("entry", []):
         resource = entry.get("resource", {})
-        if resource.get("resourceType") == "Organization":
-            # Prefer fullUrl for transaction bundle compatibility
-            full_url: str | None = entry.get("fullUrl")
-            if full_url and full_url.startswith("urn:uuid:"):
-                return full_url
-            org_id = resource.get("id")
-            if org_id:
-                return f"Organization/{org_id}"
-            if full_url:
-                return full_url
-    return None
+        resource_type = resource.get("resourceType")
+        if resource_type not in refs or refs[resource_type] is not None:
+            continue
+        # Prefer fullUrl for transaction bundle compatibility
+        # GCP FHIR API resolves urn:uuid references within transaction bundles
+        full_url: str | None = entry.get("fullUrl")
+        if full_url and full_url.startswith("urn:uuid:"):
+            refs[resource_type] = full_url
+        elif resource_id := resource.get("id"):
+            refs[resource_type] = f"{resource_type}/{resource_id}"
+        elif full_url:
+            refs[resource_type] = full_url
+        else:
+            continue
+        missing -= 1
+        if not missing:
+            break
+    return refs
 
 
-def _create_composition(
-    notes: list[ClinicalNote],
-    note_date: date,
+def _bundle_prototype(
     patient_ref: str,
     practitioner_ref: str | None,
     organization_ref: str | None,
+) -> dict[str, Any]:
+    """
+    Build the Composition prototype for one bundle.
+
+    Adds the parts that are the same for every Composition of the bundle:
+    subject, plus author and custodian when there is a practitioner or
+    organization. Its values are shared between those Compositions and never
+    mutated.
+    """
+    prototype = _COMPOSITION_PROTOTYPE.copy()
+    prototype["subject"] = {"reference": patient_ref}
+
+    # Add author if we have a practitioner
+    if practitioner_ref:
+        prototype["author"] = [{"reference": practitioner_ref}]
+
+    # Add custodian if we have an organization
+    if organization_ref:
+        prototype["custodian"] = {"reference": organization_ref}
+
+    return prototype
+
+
+def _create_composition(
+    notes: list[ClinicalNote],
+    note_date: date,
+    prototype: dict[str, Any],
     encounter_ref: str,
+    section_values: dict[tuple[str, str], tuple[str, str]],
 ) -> tuple[dict[str, Any], str]:
     """
     Create a FHIR Composition resource from clinical notes.
@@ -192,10 +287,9 @@ def _create_composition(
     Args:
         notes: List of clinical notes for this encounter
         note_date: The date of the encounter/notes
-        patient_ref: Reference to the Patient resource
-        practitioner_ref: Reference to the Practitioner resource
-        organization_ref: Reference to the Organization resource
+        prototype: The bundle's Composition prototype, from _bundle_prototype
         encounter_ref: Reference to the Encounter resource
+        section_values: The bundle's memo of section values, see _create_section
 
     Returns:
         Tuple of (FHIR Composition resource, fullUrl for bundle)
@@ -203,53 +297,36 @@ def _create_composition(
     composition_id = str(uuid4())
     full_url = f"urn:uuid:{composition_id}"
     date_str = note_date.isoformat()
+    month = _MONTH_NAMES[note_date.month - 1]
 
     # Build sections from notes
-    sections = []
-    for note in notes:
-        section = _create_section(note)
-        if section:
-            sections.append(section)
-
-    # Create the Composition
-    composition: dict[str, Any] = {
-        "resourceType": "Composition",
-        "id": composition_id,
-        "status": "final",
-        "type": {
-            "coding": [PROGRESS_NOTE_TYPE],
-            "text": "Progress note",
-        },
-        "subject": {"reference": patient_ref},
-        "encounter": {"reference": encounter_ref},
-        "date": f"{date_str}T00:00:00Z",
-        "title": f"Clinical Note - {note_date.strftime('%B %d, %Y')}",
-        "section": sections,
-    }
-
-    # Add author if we have a practitioner
-    if practitioner_ref:
-        composition["author"] = [{"reference": practitioner_ref}]
+    sections = [
+        section for note in notes if (section := _create_section(note, section_values))
+    ]
 
-    # Add custodian if we have an organization
-    if organization_ref:
-        composition["custodian"] = {"reference": organization_ref}
+    # Create the Composition from the prototype, filling in its placeholders
+    composition = prototype.copy()
+    composition["id"] = composition_id
+    composition["encounter"] = {"reference": encounter_ref}
+    composition["date"] = f"{date_str}T00:00:00Z"
+    # Same as strftime("%B %d, %Y") in the C locale, without the lookup
+    composition["title"] = (
+        f"Clinical Note - {month} {note_date.day:02d}, {note_date.year}"
+    )
+    composition["section"] = sections
 
     return composition, full_url
 
 
-def _create_section(note: ClinicalNote) -> dict[str, Any] | None:
+@lru_cache(maxsize=256)
+def _soap_section(note_type: str) -> str:
     """
-    Create a Composition section from a clinical note.
+    Map a note type to its SOAP section.
 
-    Args:
-        note: The clinical note to convert
-
-    Returns:
-        FHIR CompositionSection or None if note type is unknown
+    Memoized, since an import has many notes but only a handful of distinct
+    note types, and the partial match below scans every mapping.
     """
-    # Map note type to SOAP section
-    note_type_lower = note.note_type.lower()
+    note_type_lower = note_type.lower()
     soap_section = NOTE_TYPE_TO_SOAP.get(note_type_lower)
 
     # Try partial matching if exact match not found
@@ -260,25 +337,37 @@ def _create_section(note: ClinicalNote) -> dict[str, Any] | None:
                 break
 
     # Default to Additional if no mapping found
-    if not soap_section:
-        soap_section = "Additional"
+    return soap_section or "Additional"
+
 
-    loinc_info = SOAP_LOINC_CODES[soap_section]
+def _create_section(
+    note: ClinicalNote,
+    section_values: dict[tuple[str, str], tuple[str, str]],
+) -> dict[str, Any] | None:
+    """
+    Create a Composition section from a clinical note.
+
+    Args:
+        note: The clinical note to convert
+        section_values: Memo of (note type, content) -> (SOAP section, clean
+            content), since stock note text (e.g. "No known drug allergies")
+            repeats across encounters. Holds immutable values; each section
+            dict is built fresh from them.
 
-    # Convert HTML to Markdown for readable display
-    clean_content = _html_to_markdown(note.content)
+    Returns:
+        FHIR CompositionSection or None if note type is unknown
+    """
+    key = (note.note_type, note.content)
+    values = section_values.get(key)
+    if values is None:
+        # Map note type to SOAP section; convert HTML to Markdown for display
+        values = _soap_section(note.note_type), _html_to_markdown(note.content)
+        section_values[key] = values
+    soap_section, clean_content = values
 
     section: dict[str, Any] = {
         "title": soap_section,  # Use SOAP section name, not original note type
-        "code": {
-            "coding": [
-                {
-                    "system": "http://loinc.org",
-                    "code": loinc_info["code"],
-                    "display": loinc_info["display"],
-                }
-            ]
-        },
+        "code": {"coding": _SOAP_CODING[soap_section]},
         "text": {
             "status": "generated",
             # Note: FHIR spec requires XHTML div wrapper, but omnia frontend
@@ -300,46 +389,18 @@ def _html_to_markdown(text: str) -> str:
     2. Adds line breaks before common clinical section headers
     3. Preserves existing formatting if present
     """
-    import re
-
     # Strip HTML tags if present
-    clean = re.sub(r"<[^>]+>", "", text)
-
-    # Common clinical section headers that should start on new lines
-    section_headers = [
-        r"Past Psychiatric History",
-        r"Psychiatric Diagnoses/Course of Illness",
-        r"Hx of Psychotherapy",
-        r"Hospitalizations",
-        r"History of Suicide Attempts\??",
-        r"History of Self-harm\??",
-        r"History of Trauma\??",
-        r"Past Psychiatric Medication Trials",
-        r"Past Meds Tried:",
-        r"Past Medical History:?",
-        r"Medical Conditions",
-        r"Other Physicians Seen Regularly",
-        r"Current Medications",
-        r"Current Psychiatric Medications",
-        r"Therapy performed",
-        r"Mental Status Exam:?",
-        r"MSE:?",
-        r"Assessment:?",
-        r"Plan:?",
-        r"Diagnoses:?",
-        r"Outpatient Hx:",
-    ]
+    clean = _HTML_TAG.sub("", text)
 
-    # Add newline before each section header
-    for header in section_headers:
-        # Add newline before header if not already at start of line
-        clean = re.sub(rf"(?<!\n)({header})", r"\n\1", clean, flags=re.IGNORECASE)
+    # Add newline before each section header not already at start of line
+    for header in _SECTION_HEADERS:
+        clean = header.sub(r"\n\1", clean)
 
     # Clean up multiple spaces
-    clean = re.sub(r" {2,}", " ", clean)
+    clean = _MULTIPLE_SPACES.sub(" ", clean)
 
     # Clean up multiple newlines (max 2)
-    clean = re.sub(r"\n{3,}", "\n\n", clean)
+    clean = _EXCESS_NEWLINES.sub("\n\n", clean)
 
     return clean.strip()
 
@@ -13,7 +13,7 @@ Matching strategy:
 4. If no Person found, create both Person and Patient
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import date
 from enum import Enum
 from typing import TYPE_CHECKING
@@ -84,6 +84,10 @@ class PatientMatcher:
 
     def __init__(self, fhir_client: "FHIRClient"):
         self.fhir_client = fhir_client
+        # Search key + organization -> first result for it, so an import with
+        # several rows for one patient searches (and creates) only once. Names
+        # are casefolded, as the Person search ignores case.
+        self._resolved: dict[tuple[str, str, date, UUID], MatchResult] = {}
 
     async def match_or_create(
         self,
@@ -93,6 +97,11 @@ class PatientMatcher:
         """
         Match imported patient to existing resources or create new ones.
 
+        Results are remembered per matcher. A repeat of the same demographics
+        (names compared case-insensitively) for the same organization is
+        answered without another search, as a match of the resources the
+        first call found or created.
+
         Args:
             demographics: Patient demographics from import source
             organization_id: Target organization for the Patient resource
@@ -100,6 +109,33 @@ class PatientMatcher:
         Returns:
             MatchResult with status and resource IDs
         """
+        key = (
+            demographics.given_name.casefold(),
+            demographics.family_name.casefold(),
+            demographics.birth_date,
+            organization_id,
+        )
+        resolved = self._resolved.get(key)
+        if resolved is not None:
+            if resolved.patient_id is None:
+                # Unresolved (e.g. multiple matches): the search would repeat it
+                return replace(resolved, warnings=list(resolved.warnings or []))
+            return MatchResult(
+                status=MatchStatus.EXISTING_PERSON_EXISTING_PATIENT,
+                person_id=resolved.person_id,
+                patient_id=resolved.patient_id,
+            )
+
+        result = await self._match_or_create(demographics, organization_id)
+        self._resolved[key] = result
+        return result
+
+    async def _match_or_create(
+        self,
+        demographics: PatientDemographics,
+        organization_id: UUID,
+    ) -> MatchResult:
+        """Search for the patient and create whatever is missing."""
         warnings: list[str] = []
 
         # Step 1: Search for existing Person by demographics
@@ -1,5 +1,7 @@
 """Portia - Health Data Interchange Service."""
 
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 from typing import AsyncIterator
 
@@ -9,15 +11,40 @@ from fastapi.responses import JSONResponse
 from httpx import HTTPError, HTTPStatusError
 from pydantic import ValidationError
 
+from src.core.auth import (
+    FIREBASE_CERTS_REFRESH_SECONDS,
+    refresh_firebase_certs,
+    warm_auth_caches,
+)
 from src.routers import health, import_routes
 
+logger = logging.getLogger(__name__)
+
+
+async def _refresh_firebase_certs_periodically() -> None:
+    """Keep the Firebase signing certificates warm so verification never fetches."""
+    while True:
+        try:
+            await asyncio.to_thread(refresh_firebase_certs)
+        except Exception as e:
+            # Not fatal: verification fetches the certificates itself when stale
+            logger.warning("Could not refresh Firebase certificates: %s", e)
+        await asyncio.sleep(FIREBASE_CERTS_REFRESH_SECONDS)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Application lifespan management."""
-    # Startup
+    # Startup: load the service JWT secret before the first request needs it
+    try:
+        await asyncio.to_thread(warm_auth_caches)
+    except RuntimeError as e:
+        # Not fatal: the secret is fetched again on first use
+        logger.warning("Could not preload service auth secret: %s", e)
+    refresh_task = asyncio.create_task(_refresh_firebase_certs_periodically())
     yield
-    # Shutdown - cleanup resources if needed
+    # Shutdown
+    refresh_task.cancel()
 
 
 app = FastAPI(
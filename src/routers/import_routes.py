@@ -1,11 +1,21 @@
 """Import endpoint for health data."""
 
+import io
 import logging
+from typing import Annotated
+from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Form, HTTPException, UploadFile, status
 
+from src.core.auth import AuthenticatedUser
 from src.exceptions import ConversionError, ValidationError
-from src.import_.charm.appointment_importer import import_appointments_from_csv
+from src.import_.charm.appointment_importer import (
+    AppointmentImportResponse as ImporterResponse,
+)
+from src.import_.charm.appointment_importer import (
+    import_appointments_from_csv,
+    import_appointments_from_csv_content,
+)
 from src.import_.gateway import process_import
 from src.routers.deps import (
     CurrentUserDep,
@@ -14,12 +24,14 @@ from src.routers.deps import (
     SentiaServiceDep,
 )
 from src.schemas.import_schemas import (
+    MAX_IMPORT_SIZE_BYTES,
     AppointmentImportRequest,
     AppointmentImportResponse,
     AppointmentImportResultSchema,
     ImportRequest,
     ImportResponse,
 )
+from src.services.sentia_service import SentiaService
 
 logger = logging.getLogger(__name__)
 
@@ -140,37 +152,19 @@ async def import_data(
         ) from e
 
 
-@router.post(
-    "/appointments",
-    response_model=AppointmentImportResponse,
-    status_code=status.HTTP_201_CREATED,
-)
-async def import_appointments(
-    request: AppointmentImportRequest,
-    fhir_store: FHIRStoreServiceDep,
-    current_user: CurrentUserDep,
-    sentia_service: SentiaServiceDep,
-) -> AppointmentImportResponse:
+async def _resolve_appointment_context(
+    organization_id: UUID | None,
+    practitioner_role_id: UUID | None,
+    current_user: AuthenticatedUser,
+    sentia_service: SentiaService,
+) -> tuple[UUID, UUID, str | None, str | None]:
     """
-    Import appointments from Charm CSV export.
-
-    Requires authentication via Firebase token or service token.
-
-    For Firebase users, organization and practitioner context is resolved
-    from Sentia. For service tokens, organization_id must be provided
-    explicitly in the request.
-
-    This endpoint:
-    1. Parses the CSV and matches/creates patients
-    2. Creates FHIR Encounters with pending-import status
-    3. Creates Google Calendar events for provider review
+    Resolve organization, PractitionerRole and Sentia tokens for an import.
 
-    Patients are NOT activated (no Firebase identity, no SMS).
-    Use the activation script after provider review.
+    Returns:
+        Tuple of (organization_id, practitioner_role_id, auth_token,
+        service_token) where the tokens are used for Sentia GCal calls
     """
-    # Resolve organization context (same pattern as import_data)
-    organization_id = request.organization_id
-    practitioner_role_id = request.practitioner_role_id
     auth_token: str | None = None
 
     if current_user.auth_type == "firebase" and current_user.raw_token:
@@ -248,28 +242,92 @@ async def import_appointments(
     if current_user.auth_type == "service" and current_user.raw_token:
         # For service tokens, we need to create a token that Sentia will accept
         # The raw_token is for Portia, we need one for Sentia (audience=panova-backend)
-        from datetime import datetime, timedelta
-        from datetime import timezone as dt_timezone
+        import time
 
         import jwt
 
         from src.core.auth import _get_service_auth_secret
 
-        now = datetime.now(dt_timezone.utc)
-        expires = now + timedelta(hours=1)
+        now = int(time.time())
         payload = {
             "service_name": "portia-cli",
             "iss": "panova-services",
             "sub": "service:portia-cli",
             "aud": "panova-backend",  # Sentia's audience
-            "iat": int(now.timestamp()),
-            "exp": int(expires.timestamp()),
+            "iat": now,
+            "exp": now + 3600,
             "permissions": ["appointments.import"],
         }
         service_token = jwt.encode(
             payload, _get_service_auth_secret(), algorithm="HS256"
         )
 
+    return organization_id, practitioner_role_id, auth_token, service_token
+
+
+def _to_appointment_response(
+    result: ImporterResponse,
+) -> AppointmentImportResponse:
+    """Convert the importer's result dataclass to the API response schema."""
+    return AppointmentImportResponse(
+        total_rows=result.total_rows,
+        successful=result.successful,
+        failed=result.failed,
+        skipped=result.skipped,
+        results=[
+            AppointmentImportResultSchema(
+                charm_appointment_id=r.charm_appointment_id,
+                success=r.success,
+                patient_id=r.patient_id,
+                person_id=r.person_id,
+                encounter_id=r.encounter_id,
+                gcal_event_id=r.gcal_event_id,
+                error=r.error,
+                warnings=r.warnings,
+            )
+            for r in result.results
+        ],
+        warnings=result.warnings,
+    )
+
+
+@router.post(
+    "/appointments",
+    response_model=AppointmentImportResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def import_appointments(
+    request: AppointmentImportRequest,
+    fhir_store: FHIRStoreServiceDep,
+    current_user: CurrentUserDep,
+    sentia_service: SentiaServiceDep,
+) -> AppointmentImportResponse:
+    """
+    Import appointments from Charm CSV export.
+
+    Requires authentication via Firebase token or service token.
+
+    For Firebase users, organization and practitioner context is resolved
+    from Sentia. For service tokens, organization_id must be provided
+    explicitly in the request.
+
+    This endpoint:
+    1. Parses the CSV and matches/creates patients
+    2. Creates FHIR Encounters with pending-import status
+    3. Creates Google Calendar events for provider review
+
+    Patients are NOT activated (no Firebase identity, no SMS).
+    Use the activation script after provider review.
+    """
+    organization_id, practitioner_role_id, auth_token, service_token = (
+        await _resolve_appointment_context(
+            request.organization_id,
+            request.practitioner_role_id,
+            current_user,
+            sentia_service,
+        )
+    )
+
     try:
         result = await import_appointments_from_csv(
             csv_data_base64=request.data,
@@ -280,30 +338,74 @@ async def import_appointments(
             auth_token=auth_token,
             service_token=service_token,
         )
+        return _to_appointment_response(result)
 
-        return AppointmentImportResponse(
-            total_rows=result.total_rows,
-            successful=result.successful,
-            failed=result.failed,
-            skipped=result.skipped,
-            results=[
-                AppointmentImportResultSchema(
-                    charm_appointment_id=r.charm_appointment_id,
-                    success=r.success,
-                    patient_id=r.patient_id,
-                    person_id=r.person_id,
-                    encounter_id=r.encounter_id,
-                    gcal_event_id=r.gcal_event_id,
-                    error=r.error,
-                    warnings=r.warnings,
-                )
-                for r in result.results
-            ],
-            warnings=result.warnings,
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+
+
+@router.post(
+    "/appointments/upload",
+    response_model=AppointmentImportResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def upload_appointments(
+    file: UploadFile,
+    fhir_store: FHIRStoreServiceDep,
+    current_user: CurrentUserDep,
+    sentia_service: SentiaServiceDep,
+    organization_id: Annotated[UUID | None, Form()] = None,
+    practitioner_role_id: Annotated[UUID | None, Form()] = None,
+) -> AppointmentImportResponse:
+    """
+    Import appointments from a Charm CSV export sent as multipart/form-data.
+
+    Same behavior as POST /import/appointments, but the CSV is uploaded as a
+    raw file part instead of a base64 string inside JSON, so neither client
+    nor server holds a base64 copy of the file.
+    """
+    if file.size is not None and file.size > MAX_IMPORT_SIZE_BYTES:
+        max_mb = MAX_IMPORT_SIZE_BYTES / (1024 * 1024)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Import data exceeds maximum size of {max_mb:.0f}MB. "
+            "Please split large files or contact support.",
+        )
+
+    organization_id, practitioner_role_id, auth_token, service_token = (
+        await _resolve_appointment_context(
+            organization_id,
+            practitioner_role_id,
+            current_user,
+            sentia_service,
+        )
+    )
+
+    # Parsed straight from the spooled upload, decoding line by line, rather
+    # than holding the whole file as bytes and again as text. Invalid UTF-8
+    # surfaces as a ValueError from the importer.
+    csv_lines = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+
+    try:
+        result = await import_appointments_from_csv_content(
+            csv_content=csv_lines,
+            organization_id=organization_id,
+            practitioner_role_id=practitioner_role_id,
+            fhir_store=fhir_store,
+            sentia_service=sentia_service,
+            auth_token=auth_token,
+            service_token=service_token,
         )
+        return _to_appointment_response(result)
 
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e),
         ) from e
+    finally:
+        # UploadFile owns the underlying file and closes it itself
+        csv_lines.detach()
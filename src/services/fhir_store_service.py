@@ -14,6 +14,7 @@ from fhir_client.config import FHIRClientConfig
 from httpx import HTTPStatusError
 
 from src.settings import settings
+from src.utils.retry import retry_transient
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +29,9 @@ class PersistenceResult:
     errors: list[str]
     # Map of original fullUrl -> assigned FHIR ID
     id_mapping: dict[str, str]
+    # The server refused the transaction outright (4xx), so nothing was
+    # committed. False when the outcome is unknown (timeouts, 5xx).
+    rejected: bool = False
 
 
 class FHIRStoreService:
@@ -68,8 +72,11 @@ class FHIRStoreService:
         logger.info("Persisting transaction bundle with %d entries", entry_count)
 
         try:
-            # Use any resource client's _execute_bundle method
-            response = await self._client.patients._execute_bundle(transaction_bundle)
+            # Use any resource client's _execute_bundle method. The transaction
+            # is atomic, so a rate-limited or unavailable attempt is retried.
+            response = await retry_transient(
+                lambda: self._client.patients._execute_bundle(transaction_bundle)
+            )
 
             # Process response to extract IDs and count results
             created = 0
@@ -168,12 +175,14 @@ class FHIRStoreService:
             except Exception:
                 logger.error("Could not parse error response body")
 
+            status_code = e.response.status_code
             return PersistenceResult(
                 success=False,
                 resources_created=0,
                 resources_updated=0,
                 errors=error_details,
                 id_mapping={},
+                rejected=400 <= status_code < 500 and status_code not in (408, 429),
             )
         except Exception as e:
             logger.exception("Failed to persist bundle: %s", e)
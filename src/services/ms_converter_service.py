@@ -225,11 +225,12 @@ class MSConverterService:
         response = await client.post(
             "/convertToFhir",
             params={"api-version": "2024-05-01-preview"},
-            json=request.model_dump(),
+            headers={"Content-Type": "application/json"},
+            content=request.model_dump_json(),
         )
         response.raise_for_status()
 
-        result = ConversionResponse.model_validate(response.json())
+        result = ConversionResponse.model_validate_json(response.content)
         return result.result
 
     async def health_check(self) -> bool:
@@ -11,6 +11,7 @@ from typing import Optional
 from uuid import UUID
 
 import httpx
+import orjson
 from pydantic import BaseModel
 
 from src.settings import settings
@@ -72,9 +73,15 @@ class SentiaService:
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create the HTTP client."""
         if self._client is None:
+            # One pooled client per service, with every connection kept alive
+            # so concurrent imports reuse connections instead of reconnecting
             self._client = httpx.AsyncClient(
                 base_url=self.base_url,
                 timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=settings.sentia_max_connections,
+                    max_keepalive_connections=settings.sentia_max_connections,
+                ),
             )
         return self._client
 
@@ -109,7 +116,7 @@ class SentiaService:
             headers=headers,
         )
         practitioner_resp.raise_for_status()
-        practitioner_data = practitioner_resp.json()
+        practitioner_data = orjson.loads(practitioner_resp.content)
 
         # Extract practitioner info
         practitioner_name = None
@@ -131,7 +138,7 @@ class SentiaService:
             headers=headers,
         )
         orgs_resp.raise_for_status()
-        orgs_data = orgs_resp.json()
+        orgs_data = orjson.loads(orgs_resp.content)
 
         organizations = [
             OrganizationContext(
@@ -218,7 +225,7 @@ class SentiaService:
                 params={"count": 1},  # We only need the first role
             )
             roles_resp.raise_for_status()
-            roles_data = roles_resp.json()
+            roles_data = orjson.loads(roles_resp.content)
 
             entries = roles_data.get("entries", [])
             if not entries:
@@ -313,12 +320,12 @@ class SentiaService:
 
         response = await client.post(
             endpoint,
-            headers=headers,
-            json=payload,
+            headers={**headers, "Content-Type": "application/json"},
+            content=orjson.dumps(payload),
         )
         response.raise_for_status()
 
-        data = response.json()
+        data = orjson.loads(response.content)
         return AppointmentImportResult(
             encounter_id=UUID(data["encounter_id"]),
             gcal_event_id=data.get("gcal_event_id"),
@@ -56,6 +56,10 @@ class Settings(BaseSettings):
         default=30.0,
         description="Timeout for Sentia API requests in seconds",
     )
+    sentia_max_connections: int = Field(
+        default=32,
+        description="Connection pool size for Sentia API requests, all kept alive",
+    )
 
     model_config = SettingsConfigDict(
         env_file=".env",
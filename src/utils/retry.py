@@ -0,0 +1,73 @@
+"""Retry with exponential backoff for transient HTTP failures."""
+
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Statuses where the server did not process the request (rate limited or
+# unavailable), so retrying cannot repeat a non-idempotent create. Other
+# errors, including gateway timeouts, are raised immediately.
+RETRYABLE_STATUS_CODES = frozenset({429, 503})
+
+
+async def retry_transient(
+    call: Callable[[], Awaitable[T]],
+    *,
+    attempts: int = 3,
+    base_delay: float = 0.25,
+    max_delay: float = 4.0,
+) -> T:
+    """
+    Await call(), retrying transient failures with exponential backoff.
+
+    Retries responses with a RETRYABLE_STATUS_CODES status and connection
+    failures (the request never reached the server). Waits
+    min(max_delay, base_delay * 2**attempt) plus a little jitter between
+    attempts.
+
+    Args:
+        call: Zero-argument function returning a fresh awaitable per attempt
+        attempts: Maximum number of attempts, including the first
+        base_delay: Delay before the first retry, in seconds
+        max_delay: Upper bound on the backoff delay, in seconds
+
+    Returns:
+        The result of the first successful attempt
+
+    Raises:
+        The last error once attempts are exhausted, or any non-transient
+        error immediately
+    """
+    for attempt in range(attempts):
+        try:
+            return await call()
+        except httpx.HTTPStatusError as e:
+            if (
+                e.response.status_code not in RETRYABLE_STATUS_CODES
+                or attempt == attempts - 1
+            ):
+                raise
+            reason = f"HTTP {e.response.status_code}"
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            if attempt == attempts - 1:
+                raise
+            reason = type(e).__name__
+
+        delay = min(max_delay, base_delay * 2**attempt) + random.uniform(0, 0.1)
+        logger.warning(
+            "Transient failure (%s), retrying in %.2fs (attempt %d/%d)",
+            reason,
+            delay,
+            attempt + 2,
+            attempts,
+        )
+        await asyncio.sleep(delay)
+
+    raise AssertionError("unreachable")  # pragma: no cover
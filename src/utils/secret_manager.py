@@ -2,8 +2,6 @@
 
 from functools import lru_cache
 
-from google.cloud import secretmanager
-
 from src.settings import settings
 
 
@@ -17,6 +15,9 @@ class SecretManagerClient:
             raise ValueError(
                 "GCP project ID is required. Set GCP_PROJECT_ID environment variable."
             )
+        # Imported here so the gRPC stack loads on first use, not at import time
+        from google.cloud import secretmanager
+
         self.client = secretmanager.SecretManagerServiceClient()
 
     @lru_cache(maxsize=32)
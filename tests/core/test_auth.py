@@ -0,0 +1,224 @@
+"""Tests for hybrid Firebase/service token authentication."""
+
+import hashlib
+import time
+from typing import Any, Iterator
+from unittest.mock import MagicMock
+
+import jwt
+import pytest
+from fastapi import HTTPException, Request
+
+from src.core import auth
+from src.core.auth import (
+    SERVICE_AUTH_AUDIENCE,
+    SERVICE_AUTH_ISSUER,
+    create_service_token,
+    get_current_user,
+    verify_firebase_token,
+    verify_service_token,
+)
+
+SERVICE_SECRET = b"test-service-secret-of-32-bytes-or-more"
+
+
+def _firebase_payload(exp: int) -> dict[str, Any]:
+    """Create a decoded Firebase ID token payload."""
+    now = int(time.time())
+    return {
+        "iss": "https://securetoken.google.com/portia-test",
+        "aud": "portia-test",
+        "user_id": "user-1",
+        "sub": "user-1",
+        "iat": now,
+        "exp": exp,
+    }
+
+
+def _bearer_request(token: str) -> Request:
+    """Create a request carrying token as its Bearer credential."""
+    return Request(
+        {"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]}
+    )
+
+
+def _service_claims(**overrides: Any) -> dict[str, Any]:
+    """Create service token claims, with overrides (None removes a claim)."""
+    now = int(time.time())
+    claims = {
+        "service_name": "sentia",
+        "iss": SERVICE_AUTH_ISSUER,
+        "sub": "service:sentia",
+        "aud": SERVICE_AUTH_AUDIENCE,
+        "iat": now,
+        "exp": now + 3600,
+        "permissions": ["import.write"],
+    }
+    claims.update(overrides)
+    return {k: v for k, v in claims.items() if v is not None}
+
+
+@pytest.fixture(autouse=True)
+def clear_token_caches() -> Iterator[None]:
+    """Start and end every test with empty token caches."""
+    auth._VERIFIED_TOKEN_CACHE.clear()
+    auth._REJECTED_TOKEN_CACHE.clear()
+    auth._SIGNED_TOKEN_CACHE.clear()
+    yield
+    auth._VERIFIED_TOKEN_CACHE.clear()
+    auth._REJECTED_TOKEN_CACHE.clear()
+    auth._SIGNED_TOKEN_CACHE.clear()
+
+
+@pytest.fixture(autouse=True)
+def service_secret(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Sign service tokens with a test secret instead of Secret Manager."""
+    monkeypatch.setattr(auth, "_get_service_auth_key", lambda: SERVICE_SECRET)
+
+
+@pytest.fixture
+def firebase_decode(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Replace Firebase signature verification with a mock decoder."""
+    decode = MagicMock(return_value=_firebase_payload(int(time.time()) + 3600))
+    monkeypatch.setattr(auth, "_firebase_token_decoder", lambda: decode)
+    monkeypatch.setattr(auth, "_get_firebase_certs", lambda: {})
+    return decode
+
+
+class TestVerifiedTokenCache:
+    """Tests for the verified token cache."""
+
+    def test_repeat_firebase_token_skips_verification(
+        self, firebase_decode: MagicMock
+    ) -> None:
+        """Test that a verified Firebase token is served from the cache."""
+        first = verify_firebase_token("firebase-token")
+        second = verify_firebase_token("firebase-token")
+
+        assert second is first
+        firebase_decode.assert_called_once()
+
+    def test_cached_firebase_token_rejected_on_service_path(
+        self, firebase_decode: MagicMock
+    ) -> None:
+        """Test that a cached Firebase token is not accepted as a service token."""
+        verify_firebase_token("firebase-token")
+
+        with pytest.raises(HTTPException) as exc_info:
+            verify_service_token("firebase-token")
+
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.detail == "Invalid service token: not a service token"
+
+    def test_cached_service_token_rejected_on_firebase_path(
+        self, firebase_decode: MagicMock
+    ) -> None:
+        """Test that a cached service token is not accepted as a Firebase token."""
+        token = create_service_token("sentia", ["import.write"])
+        assert verify_service_token(token).service_name == "sentia"
+
+        with pytest.raises(HTTPException) as exc_info:
+            verify_firebase_token(token)
+
+        assert exc_info.value.status_code == 401
+        assert "not a Firebase token" in exc_info.value.detail
+        firebase_decode.assert_not_called()
+
+    def test_expired_entry_is_reverified(self, firebase_decode: MagicMock) -> None:
+        """Test that an entry past its token's exp is verified again."""
+        firebase_decode.return_value = _firebase_payload(int(time.time()) - 1)
+
+        verify_firebase_token("firebase-token")
+        verify_firebase_token("firebase-token")
+
+        assert firebase_decode.call_count == 2
+
+    def test_cache_keyed_by_token_hash(self, firebase_decode: MagicMock) -> None:
+        """Test that the cache holds a hash of the token, not the token itself."""
+        token = "firebase-token"
+        verify_firebase_token(token)
+
+        assert list(auth._VERIFIED_TOKEN_CACHE) == [
+            hashlib.sha256(token.encode()).digest()
+        ]
+        assert token not in auth._VERIFIED_TOKEN_CACHE
+        assert token.encode() not in auth._VERIFIED_TOKEN_CACHE
+
+    def test_full_cache_evicts_oldest(
+        self, firebase_decode: MagicMock, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a full cache drops its oldest entry."""
+        monkeypatch.setattr(auth, "_VERIFIED_TOKEN_CACHE_MAX_SIZE", 2)
+
+        for token in ("token-1", "token-2", "token-3"):
+            verify_firebase_token(token)
+
+        assert list(auth._VERIFIED_TOKEN_CACHE) == [
+            auth._token_cache_key("token-2"),
+            auth._token_cache_key("token-3"),
+        ]
+
+
+class TestBearerIssuerRouting:
+    """Tests that the unverified issuer only picks the verifier."""
+
+    @pytest.mark.anyio
+    async def test_service_token_accepted(self, firebase_decode: MagicMock) -> None:
+        """Test that a valid service token is verified on the service path."""
+        token = jwt.encode(_service_claims(), SERVICE_SECRET, algorithm="HS256")
+
+        user = await get_current_user(_bearer_request(token))
+
+        assert user.auth_type == "service"
+        assert user.service_name == "sentia"
+        firebase_decode.assert_not_called()
+
+    @pytest.mark.anyio
+    async def test_forged_service_issuer_still_verified(
+        self, firebase_decode: MagicMock
+    ) -> None:
+        """Test that claiming the service issuer does not skip the signature."""
+        token = jwt.encode(
+            _service_claims(), b"forged-secret-of-32-bytes-or-more", algorithm="HS256"
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(_bearer_request(token))
+
+        assert exc_info.value.status_code == 401
+        assert auth._is_recently_rejected("service", auth._token_cache_key(token))
+        firebase_decode.assert_not_called()
+
+    @pytest.mark.anyio
+    async def test_unsigned_service_issuer_rejected(
+        self, firebase_decode: MagicMock
+    ) -> None:
+        """Test that an unsigned token claiming the service issuer is rejected."""
+        token = jwt.encode(_service_claims(), None, algorithm="none")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(_bearer_request(token))
+
+        assert exc_info.value.status_code == 401
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "iss", [None, "https://securetoken.google.com/portia-test", "panova"]
+    )
+    async def test_other_issuer_verified_as_firebase(
+        self, iss: str | None, firebase_decode: MagicMock
+    ) -> None:
+        """Test that a missing or other issuer goes through Firebase verification.
+
+        The token is signed with the real service secret, so it would pass
+        service verification if the issuer were ignored.
+        """
+        firebase_decode.side_effect = ValueError("Could not verify token signature")
+        token = jwt.encode(_service_claims(iss=iss), SERVICE_SECRET, algorithm="HS256")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(_bearer_request(token))
+
+        assert exc_info.value.status_code == 401
+        firebase_decode.assert_called_once()
+        assert firebase_decode.call_args.args[0] == token
@@ -1,5 +1,6 @@
 """Tests for patient matcher."""
 
+from dataclasses import replace
 from datetime import date
 from unittest.mock import AsyncMock, MagicMock
 from uuid import UUID, uuid4
@@ -233,6 +234,83 @@ class TestPatientMatcher:
         assert result.warnings is not None
         assert "2 Person resources" in result.warnings[0]
 
+    @pytest.mark.anyio
+    async def test_repeat_demographics_reuse_first_match(
+        self,
+        mock_fhir_client: MagicMock,
+        sample_demographics: PatientDemographics,
+        organization_id: UUID,
+    ) -> None:
+        """Test that repeat demographics match what the first call created."""
+        # Mock empty search response
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"entry": []}
+        mock_response.raise_for_status = MagicMock()
+        mock_fhir_client.persons.client.get = AsyncMock(return_value=mock_response)
+
+        # Mock person creation
+        person_id = uuid4()
+        mock_person = MagicMock()
+        mock_person.id = person_id
+        mock_person.link = None
+        mock_fhir_client.persons.create.return_value = mock_person
+
+        # Mock patient creation
+        patient_id = uuid4()
+        mock_patient = MagicMock()
+        mock_patient.id = patient_id
+        mock_fhir_client.patients.find_or_create_for_person_and_organization.return_value = (
+            mock_patient
+        )
+
+        matcher = PatientMatcher(mock_fhir_client)
+        first = await matcher.match_or_create(sample_demographics, organization_id)
+        second = await matcher.match_or_create(sample_demographics, organization_id)
+
+        assert first.status == MatchStatus.NEW_PERSON_NEW_PATIENT
+        assert second.status == MatchStatus.EXISTING_PERSON_EXISTING_PATIENT
+        assert second.person_id == person_id
+        assert second.patient_id == patient_id
+        assert second.person_created is False
+        assert second.patient_created is False
+        mock_fhir_client.persons.client.get.assert_awaited_once()
+        mock_fhir_client.persons.create.assert_awaited_once()
+
+    @pytest.mark.anyio
+    async def test_repeat_demographics_ignore_name_case(
+        self,
+        mock_fhir_client: MagicMock,
+        sample_demographics: PatientDemographics,
+        organization_id: UUID,
+    ) -> None:
+        """Test that names differing only in case reuse the first match."""
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"entry": []}
+        mock_response.raise_for_status = MagicMock()
+        mock_fhir_client.persons.client.get = AsyncMock(return_value=mock_response)
+        mock_person = MagicMock()
+        mock_person.id = uuid4()
+        mock_person.link = None
+        mock_fhir_client.persons.create.return_value = mock_person
+        mock_patient = MagicMock()
+        mock_patient.id = uuid4()
+        mock_fhir_client.patients.find_or_create_for_person_and_organization.return_value = (
+            mock_patient
+        )
+        shouted = replace(
+            sample_demographics,
+            given_name=sample_demographics.given_name.upper(),
+            family_name=sample_demographics.family_name.upper(),
+        )
+
+        matcher = PatientMatcher(mock_fhir_client)
+        first = await matcher.match_or_create(sample_demographics, organization_id)
+        second = await matcher.match_or_create(shouted, organization_id)
+
+        assert second.status == MatchStatus.EXISTING_PERSON_EXISTING_PATIENT
+        assert second.patient_id == first.patient_id
+        mock_fhir_client.persons.client.get.assert_awaited_once()
+
 
 class TestDemographicsFromExtraction:
     """Tests for demographics_from_extraction function."""
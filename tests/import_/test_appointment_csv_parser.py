@@ -0,0 +1,186 @@
+"""Tests for the Charm appointment CSV parser."""
+
+import re
+from collections.abc import Callable
+from datetime import date, datetime
+from typing import Any
+
+import pytest
+
+from src.import_.charm import appointment_csv_parser
+from src.import_.charm.appointment_csv_parser import (
+    _parse_datetime,
+    _parse_dob,
+    parse_appointment_csv,
+)
+
+CSV_HEADER = "Appointment ID,Patient Name,DOB,Date/Time,Reason\n"
+
+# Matches nothing, so patching it in forces the strptime fallback
+_NEVER = re.compile(r"(?!)")
+
+
+def _outcome(parse: Callable[..., Any], *args: str) -> Any:
+    """Return what parse returns, or the type of error it raises."""
+    try:
+        return parse(*args)
+    except ValueError as e:
+        return type(e)
+
+
+class TestParseAppointmentCsv:
+    """Tests for parse_appointment_csv."""
+
+    def test_parses_rows(self) -> None:
+        """Test that each data row becomes one appointment."""
+        appointments = parse_appointment_csv(
+            CSV_HEADER
+            + "A1,Jane Doe,26-Sep-44,1/22/26 12:00,Follow-up\r\n"
+            + "A2,John Roe,01-Jan-80,1/22/26 13:00,\r\n"
+        )
+
+        assert [a.charm_appointment_id for a in appointments] == ["A1", "A2"]
+        assert appointments[0].reason == "Follow-up"
+        assert appointments[1].reason is None
+
+    @pytest.mark.parametrize(
+        "separator",
+        ["\x85", "\x0b", "\x0c", "\x1c", "\x1d", "\x1e", "\u2028", "\u2029"],
+    )
+    def test_unicode_line_separators_stay_in_field(self, separator: str) -> None:
+        """Test that non-newline line separators do not split a row."""
+        reason = f"pain{separator}med check"
+        appointments = parse_appointment_csv(
+            CSV_HEADER
+            + "A1,Jane Doe,26-Sep-44,1/22/26 12:00,Follow-up\n"
+            + f"A2,John Roe,01-Jan-80,1/22/26 13:00,{reason}\n"
+        )
+
+        assert len(appointments) == 2
+        assert appointments[1].charm_appointment_id == "A2"
+        assert appointments[1].reason == reason
+
+    def test_quoted_multiline_field(self) -> None:
+        """Test that a quoted field may span lines."""
+        appointments = parse_appointment_csv(
+            CSV_HEADER + 'A1,Jane Doe,26-Sep-44,1/22/26 12:00,"line one\nline two"\n'
+        )
+
+        assert len(appointments) == 1
+        assert appointments[0].reason == "line one\nline two"
+
+
+class TestParseDob:
+    """Tests for _parse_dob."""
+
+    @pytest.mark.parametrize(
+        ("dob_str", "expected"),
+        [
+            ("26-Sep-44", date(1944, 9, 26)),
+            ("25-Nov-79", date(1979, 11, 25)),
+            ("30-Mar-01", date(2001, 3, 30)),
+            ("1-jan-70", date(1970, 1, 1)),
+            ("01-JAN-69", date(1969, 1, 1)),
+        ],
+    )
+    def test_charm_format(self, dob_str: str, expected: date) -> None:
+        """Test the usual Charm DOB format."""
+        assert _parse_dob(dob_str) == expected
+
+    def test_recent_years_moved_to_1900s(self) -> None:
+        """Test that a DOB under 10 years ago is taken as the 1900s."""
+        year = datetime.now().year - 5
+        assert _parse_dob(f"15-Jun-{year % 100:02d}") == date(year - 100, 6, 15)
+
+    @pytest.mark.parametrize(
+        "dob_str",
+        [
+            "26-Sep-44",
+            "1-jan-70",
+            "01-Jan-00",
+            "15-Jun-68",
+            "15-Jun-69",
+            "31-Dec-99",
+            f"01-Jan-{(datetime.now().year - 10) % 100:02d}",
+            f"01-Jan-{(datetime.now().year - 9) % 100:02d}",
+            "29-Feb-00",
+            "29-Feb-44",
+            "29-Feb-43",
+            "31-Apr-80",
+            "00-Jan-80",
+            "26-Sept-44",
+            "26-Foo-44",
+            "1944-09-26",
+            "9/26/1944",
+            "9/26/44",
+            "",
+        ],
+    )
+    def test_fast_path_matches_strptime(
+        self, dob_str: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the fast path gives the same result as strptime."""
+        fast = _outcome(_parse_dob, dob_str)
+        monkeypatch.setattr(appointment_csv_parser, "_CHARM_DOB_PATTERN", _NEVER)
+
+        assert fast == _outcome(_parse_dob, dob_str)
+
+
+class TestParseDatetime:
+    """Tests for _parse_datetime."""
+
+    @pytest.mark.parametrize(
+        ("date_time_str", "expected"),
+        [
+            ("1/22/26 12:00", datetime(2026, 1, 22, 12, 0)),
+            ("1/22/2026 12:00", datetime(2026, 1, 22, 12, 0)),
+            ("1/22/26 12:00 AM", datetime(2026, 1, 22, 0, 0)),
+            ("1/22/26 12:00 PM", datetime(2026, 1, 22, 12, 0)),
+            ("1/22/26 1:30 pm", datetime(2026, 1, 22, 13, 30)),
+            ("2026-01-22 09:15", datetime(2026, 1, 22, 9, 15)),
+        ],
+    )
+    def test_charm_formats(self, date_time_str: str, expected: datetime) -> None:
+        """Test Charm's appointment datetime formats."""
+        parsed = _parse_datetime(date_time_str, "US/Pacific")
+
+        assert parsed.replace(tzinfo=None) == expected
+        assert str(parsed.tzinfo) == "America/Los_Angeles"
+
+    @pytest.mark.parametrize(
+        "date_time_str",
+        [
+            "1/22/26 12:00",
+            "01/02/26 00:00",
+            "12/31/68 23:59",
+            "12/31/69 23:59",
+            "1/22/2026 12:00",
+            "1/22/1999 12:00",
+            "1/22/0026 12:00",
+            "1/22/26 12:00 AM",
+            "1/22/26 12:00 PM",
+            "1/22/26 12:59 am",
+            "1/22/26 1:00 AM",
+            "1/22/26 11:30 PM",
+            "1/22/26 0:30 AM",
+            "1/22/26 13:00 PM",
+            "1/22/2026 12:00 PM",
+            "2/29/24 10:00",
+            "2/29/25 10:00",
+            "2/30/26 10:00",
+            "13/1/26 10:00",
+            "1/22/26 24:00",
+            "1/22/26 12:60",
+            "2026-01-22 12:00",
+            "1/22/26",
+            "",
+        ],
+    )
+    def test_fast_path_matches_strptime(
+        self, date_time_str: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the fast path gives the same result as strptime."""
+        fast = _outcome(_parse_datetime, date_time_str, "US/Eastern")
+        monkeypatch.setattr(appointment_csv_parser, "_CHARM_DATETIME_PATTERN", _NEVER)
+
+        assert fast == _outcome(_parse_datetime, date_time_str, "US/Eastern")
@@ -0,0 +1,264 @@
+"""Tests for the Charm appointment importer."""
+
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
+
+import orjson
+import pytest
+
+from src.import_.charm.appointment_importer import (
+    import_appointments_from_csv_content,
+)
+from src.services.fhir_store_service import FHIRStoreService, PersistenceResult
+from src.services.sentia_service import AppointmentImportResult, SentiaService
+
+CSV_HEADER = "Appointment ID,Patient Name,DOB,Date/Time,Timezone,Duration(mins)\n"
+
+
+def _csv(*rows: str) -> str:
+    """Build a Charm appointment CSV from data rows."""
+    return CSV_HEADER + "".join(f"{row}\n" for row in rows)
+
+
+def _persisted(bundle: dict[str, Any], _organization_id: UUID) -> PersistenceResult:
+    """Persist every entry of a bundle, assigning new IDs."""
+    entries = bundle["entry"]
+    return PersistenceResult(
+        success=True,
+        resources_created=len(entries),
+        resources_updated=0,
+        errors=[],
+        id_mapping={entry["fullUrl"]: str(uuid4()) for entry in entries},
+    )
+
+
+def _failed(rejected: bool) -> PersistenceResult:
+    """Create a failed persist result."""
+    return PersistenceResult(
+        success=False,
+        resources_created=0,
+        resources_updated=0,
+        errors=["upstream error"],
+        id_mapping={},
+        rejected=rejected,
+    )
+
+
+def _search_response(entries: list[dict[str, Any]]) -> MagicMock:
+    """Create a mock FHIR search response."""
+    response = MagicMock()
+    response.raise_for_status = MagicMock()
+    response.json.return_value = {"entry": entries}
+    response.content = orjson.dumps({"entry": entries})
+    return response
+
+
+@pytest.fixture
+def organization_id() -> UUID:
+    """Create a test organization ID (fresh per test, so never cached)."""
+    return uuid4()
+
+
+@pytest.fixture
+def mock_fhir_store() -> MagicMock:
+    """Create a mock FHIR store whose client finds no existing Person."""
+    store = MagicMock(spec=FHIRStoreService)
+    client = MagicMock()
+    store.client = client
+
+    # Default location lookup
+    client.locations.base_url = "https://healthcare.googleapis.com/v1/test/fhir"
+    client.locations._get_auth_headers = MagicMock(return_value={})
+    client.locations.client.get = AsyncMock(
+        return_value=_search_response(
+            [
+                {
+                    "resource": {
+                        "resourceType": "Location",
+                        "id": str(uuid4()),
+                        "name": "Main Clinic",
+                    }
+                }
+            ]
+        )
+    )
+
+    # Patient matching: no Person found, so one is created
+    client.persons.base_url = "https://healthcare.googleapis.com/v1/test/fhir"
+    client.persons._get_auth_headers = MagicMock(return_value={})
+    client.persons.client.get = AsyncMock(return_value=_search_response([]))
+    person = MagicMock()
+    person.id = uuid4()
+    person.link = None
+    client.persons.create = AsyncMock(return_value=person)
+    patient = MagicMock()
+    patient.id = uuid4()
+    client.patients.find_or_create_for_person_and_organization = AsyncMock(
+        return_value=patient
+    )
+
+    store.persist_bundle = AsyncMock(side_effect=_persisted)
+    return store
+
+
+@pytest.fixture
+def mock_sentia() -> AsyncMock:
+    """Create a mock Sentia service that creates GCal events."""
+    sentia = AsyncMock(spec=SentiaService)
+    sentia.create_imported_appointment.side_effect = (
+        lambda **kwargs: AppointmentImportResult(
+            encounter_id=kwargs["encounter_id"], gcal_event_id="gcal-1"
+        )
+    )
+    return sentia
+
+
+class TestImportAppointments:
+    """Tests for import_appointments_from_csv_content."""
+
+    @pytest.mark.anyio
+    async def test_same_patient_rows_create_one_patient(
+        self,
+        mock_fhir_store: MagicMock,
+        mock_sentia: AsyncMock,
+        organization_id: UUID,
+    ) -> None:
+        """Test that concurrent rows for one patient create it only once."""
+        csv_content = _csv(
+            "A1,Jane Doe,26-Sep-44,1/22/26 12:00,US/Pacific,30",
+            "A2,Jane Doe,26-Sep-44,1/29/26 12:00,US/Pacific,30",
+        )
+
+        response = await import_appointments_from_csv_content(
+            csv_content=csv_content,
+            organization_id=organization_id,
+            practitioner_role_id=uuid4(),
+            fhir_store=mock_fhir_store,
+            sentia_service=mock_sentia,
+            service_token="service-token",
+        )
+
+        assert response.successful == 2
+        first, second = response.results
+        assert first.patient_id is not None
+        assert first.patient_id == second.patient_id
+        assert first.encounter_id != second.encounter_id
+        mock_fhir_store.client.persons.create.assert_awaited_once()
+        mock_fhir_store.client.persons.client.get.assert_awaited_once()
+        assert mock_sentia.create_imported_appointment.await_count == 2
+
+    @pytest.mark.anyio
+    async def test_row_errors_reported_per_row(
+        self,
+        mock_fhir_store: MagicMock,
+        mock_sentia: AsyncMock,
+        organization_id: UUID,
+    ) -> None:
+        """Test that failed rows get their own error and others still import."""
+        person_search = mock_fhir_store.client.persons.client.get
+
+        async def search(url: str, headers: Any, params: dict[str, str]) -> Any:
+            if params["given"] == "Broken":
+                raise RuntimeError("Person search failed")
+            if params["given"] == "Twin":
+                return _search_response(
+                    [
+                        {"resource": {"resourceType": "Person", "id": str(uuid4())}},
+                        {"resource": {"resourceType": "Person", "id": str(uuid4())}},
+                    ]
+                )
+            return _search_response([])
+
+        person_search.side_effect = search
+        csv_content = _csv(
+            "A1,Jane Doe,26-Sep-44,1/22/26 12:00,US/Pacific,30",
+            "A2,Broken Row,26-Sep-44,1/22/26 13:00,US/Pacific,30",
+            "A3,Twin Match,26-Sep-44,1/22/26 14:00,US/Pacific,30",
+            "A4,John Roe,26-Sep-44,1/22/26 15:00,US/Pacific,-15",
+            "A5,Jane Doe,26-Sep-44,1/22/26 16:00,US/Pacific,0",
+        )
+
+        response = await import_appointments_from_csv_content(
+            csv_content=csv_content,
+            organization_id=organization_id,
+            practitioner_role_id=uuid4(),
+            fhir_store=mock_fhir_store,
+            sentia_service=mock_sentia,
+            service_token="service-token",
+        )
+
+        assert response.total_rows == 5
+        assert (response.successful, response.failed, response.skipped) == (2, 2, 1)
+        results = {r.charm_appointment_id: r for r in response.results}
+        assert results["A1"].success is True
+        assert results["A2"].error == "Person search failed"
+        assert results["A3"].error is not None
+        assert "Multiple patient matches" in results["A3"].error
+        assert results["A4"].error == "Invalid duration: -15 minutes"
+        assert results["A5"].success is True  # Zero-length visits are valid
+        # Only the matched rows reach FHIR and Sentia
+        mock_fhir_store.persist_bundle.assert_awaited_once()
+        assert mock_sentia.create_imported_appointment.await_count == 2
+
+    @pytest.mark.anyio
+    async def test_rejected_bundle_retries_rows_individually(
+        self,
+        mock_fhir_store: MagicMock,
+        mock_sentia: AsyncMock,
+        organization_id: UUID,
+    ) -> None:
+        """Test that a 4xx-rejected bundle falls back to one Encounter per row."""
+
+        def persist(bundle: dict[str, Any], org_id: UUID) -> PersistenceResult:
+            if len(bundle["entry"]) > 1:
+                return _failed(rejected=True)
+            return _persisted(bundle, org_id)
+
+        mock_fhir_store.persist_bundle.side_effect = persist
+
+        response = await import_appointments_from_csv_content(
+            csv_content=_csv(
+                "A1,Jane Doe,26-Sep-44,1/22/26 12:00,US/Pacific,30",
+                "A2,John Roe,26-Sep-44,1/22/26 13:00,US/Pacific,30",
+            ),
+            organization_id=organization_id,
+            practitioner_role_id=uuid4(),
+            fhir_store=mock_fhir_store,
+            sentia_service=mock_sentia,
+            service_token="service-token",
+        )
+
+        assert response.successful == 2
+        assert mock_fhir_store.persist_bundle.await_count == 3
+
+    @pytest.mark.anyio
+    async def test_unknown_bundle_failure_fails_whole_chunk(
+        self,
+        mock_fhir_store: MagicMock,
+        mock_sentia: AsyncMock,
+        organization_id: UUID,
+    ) -> None:
+        """Test that a 5xx/transport failure is not retried per row."""
+        mock_fhir_store.persist_bundle.side_effect = None
+        mock_fhir_store.persist_bundle.return_value = _failed(rejected=False)
+
+        response = await import_appointments_from_csv_content(
+            csv_content=_csv(
+                "A1,Jane Doe,26-Sep-44,1/22/26 12:00,US/Pacific,30",
+                "A2,John Roe,26-Sep-44,1/22/26 13:00,US/Pacific,30",
+            ),
+            organization_id=organization_id,
+            practitioner_role_id=uuid4(),
+            fhir_store=mock_fhir_store,
+            sentia_service=mock_sentia,
+            service_token="service-token",
+        )
+
+        assert response.failed == 2
+        assert all(
+            r.error == "Failed to create encounter: ['upstream error']"
+            for r in response.results
+        )
+        mock_fhir_store.persist_bundle.assert_awaited_once()
+        mock_sentia.create_imported_appointment.assert_not_awaited()
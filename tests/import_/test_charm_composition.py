@@ -380,3 +380,22 @@ class TestCompositionBuilder:
                 assert "<bad>" not in div
                 # Ampersands should appear as plain text
                 assert "& " in div or "&" not in div
+
+    def test_no_notes_leaves_bundle_unchanged(
+        self,
+        sample_fhir_bundle_with_encounters: dict[str, Any],
+        sample_extraction_result: CharmExtractionResult,
+        encounter_date_map: dict[date, str],
+    ) -> None:
+        """Test that an extraction without notes adds no Compositions."""
+        sample_extraction_result.notes = []
+        entry_count = len(sample_fhir_bundle_with_encounters["entry"])
+
+        result_bundle, warnings = build_compositions(
+            sample_fhir_bundle_with_encounters,
+            sample_extraction_result,
+            encounter_date_map,
+        )
+
+        assert len(result_bundle["entry"]) == entry_count
+        assert warnings == ["No clinical notes to build Compositions from"]
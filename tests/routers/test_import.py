@@ -1,12 +1,26 @@
 """Tests for import endpoint."""
 
 import base64
+from collections.abc import Iterable
+from typing import Any
 from unittest.mock import AsyncMock
 
 import pytest
 
-from src.schemas.import_schemas import MAX_BASE64_SIZE
-from tests.conftest import ClientFactory
+from src.import_.charm.appointment_importer import (
+    AppointmentImportResponse,
+    AppointmentImportResult,
+)
+from src.routers import import_routes
+from src.schemas.import_schemas import MAX_BASE64_SIZE, MAX_IMPORT_SIZE_BYTES
+from tests.conftest import TEST_ORGANIZATION_ID, ClientFactory
+
+TEST_PRACTITIONER_ROLE_ID = "00000000-0000-0000-0000-000000000003"
+
+APPOINTMENT_CSV = (
+    "Appointment ID,Patient Name,DOB,Date/Time,Reason\r\n"
+    "A1,Zoë Doe,26-Sep-44,1/22/26 12:00,Café visit\r\n"
+)
 
 
 class TestImportEndpoint:
@@ -198,3 +212,115 @@ class TestImportEndpoint:
 
         assert response.status_code == 422
         assert "exceeds maximum size" in str(response.json()["detail"])
+
+
+class TestAppointmentUploadEndpoint:
+    """Tests for the /import/appointments/upload endpoint."""
+
+    @pytest.mark.anyio
+    async def test_upload_success(
+        self,
+        client_factory: ClientFactory,
+        mock_sentia_service: AsyncMock,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Uploaded CSV is decoded and streamed to the importer."""
+        received: list[str] = []
+
+        async def import_csv(
+            csv_content: Iterable[str], **kwargs: Any
+        ) -> AppointmentImportResponse:
+            received.extend(csv_content)
+            return AppointmentImportResponse(
+                total_rows=1,
+                successful=1,
+                failed=0,
+                skipped=0,
+                results=[
+                    AppointmentImportResult(success=True, charm_appointment_id="A1")
+                ],
+                warnings=["Parsed 1 appointments from CSV"],
+            )
+
+        importer = AsyncMock(side_effect=import_csv)
+        monkeypatch.setattr(
+            import_routes, "import_appointments_from_csv_content", importer
+        )
+
+        async with client_factory() as client:
+            response = await client.post(
+                "/import/appointments/upload",
+                files={
+                    "file": ("appointments.csv", APPOINTMENT_CSV.encode(), "text/csv")
+                },
+                data={
+                    "organization_id": str(TEST_ORGANIZATION_ID),
+                    "practitioner_role_id": TEST_PRACTITIONER_ROLE_ID,
+                },
+            )
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data["total_rows"] == 1
+        assert data["successful"] == 1
+        assert data["results"][0]["charm_appointment_id"] == "A1"
+        assert "".join(received) == APPOINTMENT_CSV
+        kwargs = importer.call_args.kwargs
+        assert kwargs["organization_id"] == TEST_ORGANIZATION_ID
+        assert str(kwargs["practitioner_role_id"]) == TEST_PRACTITIONER_ROLE_ID
+        assert kwargs["auth_token"] == "test-firebase-token"
+        mock_sentia_service.validate_practitioner_org_access.assert_awaited_once()
+
+    @pytest.mark.anyio
+    async def test_upload_oversized_file_returns_413(
+        self,
+        client_factory: ClientFactory,
+        mock_sentia_service: AsyncMock,
+    ) -> None:
+        """File exceeding the size limit is rejected before any import work."""
+        async with client_factory() as client:
+            response = await client.post(
+                "/import/appointments/upload",
+                files={
+                    "file": (
+                        "appointments.csv",
+                        b"A" * (MAX_IMPORT_SIZE_BYTES + 1),
+                        "text/csv",
+                    )
+                },
+                data={
+                    "organization_id": str(TEST_ORGANIZATION_ID),
+                    "practitioner_role_id": TEST_PRACTITIONER_ROLE_ID,
+                },
+            )
+
+        assert response.status_code == 413
+        assert "exceeds maximum size" in response.json()["detail"]
+        mock_sentia_service.validate_practitioner_org_access.assert_not_awaited()
+
+    @pytest.mark.anyio
+    async def test_upload_non_utf8_returns_400(
+        self,
+        client_factory: ClientFactory,
+        mock_fhir_store_service: AsyncMock,
+    ) -> None:
+        """File that is not valid UTF-8 returns 400."""
+        async with client_factory() as client:
+            response = await client.post(
+                "/import/appointments/upload",
+                files={
+                    "file": (
+                        "appointments.csv",
+                        APPOINTMENT_CSV.encode("latin-1"),
+                        "text/csv",
+                    )
+                },
+                data={
+                    "organization_id": str(TEST_ORGANIZATION_ID),
+                    "practitioner_role_id": TEST_PRACTITIONER_ROLE_ID,
+                },
+            )
+
+        assert response.status_code == 400
+        assert "Failed to decode CSV data" in response.json()["detail"]
+        mock_fhir_store_service.persist_bundle.assert_not_awaited()
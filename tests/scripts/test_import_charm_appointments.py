@@ -0,0 +1,70 @@
+"""Tests for the Charm appointment import script."""
+
+import csv
+import io
+
+from scripts.import_charm_appointments import split_csv
+
+CSV_HEADER = "Record ID,Patient Name,DOB,Date/Time\r\n"
+
+
+def _split(rows: list[str], chunk_rows: int = 1) -> list[list[list[str]]]:
+    """Split CSV rows and return each chunk's data rows."""
+    csv_file = io.StringIO(CSV_HEADER + "".join(f"{r}\r\n" for r in rows), newline="")
+    chunks, row_count = split_csv(csv_file, chunk_rows=chunk_rows)
+    assert row_count == len(rows)
+    parsed = [list(csv.reader(io.StringIO(c.decode(), newline=""))) for c in chunks]
+    assert all(chunk[0] == next(csv.reader([CSV_HEADER])) for chunk in parsed)
+    return [chunk[1:] for chunk in parsed]
+
+
+class TestSplitCsv:
+    """Tests for split_csv."""
+
+    def test_chunks_by_row_count(self) -> None:
+        """Test that different patients are split into chunks of chunk_rows."""
+        chunks = _split(
+            [
+                "R1,Jane Doe,26-Sep-44,1/22/26 12:00",
+                "R2,John Roe,01-Jan-80,1/22/26 13:00",
+                "R3,Ann Poe,02-Feb-90,1/22/26 14:00",
+            ],
+            chunk_rows=2,
+        )
+
+        assert [[row[0] for row in chunk] for chunk in chunks] == [
+            ["R1", "R2"],
+            ["R3"],
+        ]
+
+    def test_mixed_record_ids_share_a_chunk(self) -> None:
+        """Test that one patient's rows stay together whatever their Record ID."""
+        chunks = _split(
+            [
+                "R1,Jane Doe,26-Sep-44,1/22/26 12:00",
+                ",Jane Doe,26-Sep-44,1/23/26 12:00",
+                "R9,Jane Doe,26-Sep-44,1/24/26 12:00",
+                "R2,John Roe,01-Jan-80,1/22/26 13:00",
+            ]
+        )
+
+        assert [[row[0] for row in chunk] for chunk in chunks] == [
+            ["R1", "", "R9"],
+            ["R2"],
+        ]
+
+    def test_mixed_case_and_dob_format_share_a_chunk(self) -> None:
+        """Test that names are matched case-insensitively and DOBs by date."""
+        chunks = _split(
+            [
+                "R1,Jane Doe,26-Sep-44,1/22/26 12:00",
+                "R9,JANE DOE,26-SEP-44,1/23/26 12:00",
+                ",jane  doe,9/26/1944,1/24/26 12:00",
+                "R3,Jane Doe,27-Sep-44,1/25/26 12:00",
+            ]
+        )
+
+        assert [[row[3] for row in chunk] for chunk in chunks] == [
+            ["1/22/26 12:00", "1/23/26 12:00", "1/24/26 12:00"],
+            ["1/25/26 12:00"],
+        ]
@@ -0,0 +1,100 @@
+"""Tests for retrying transient HTTP failures."""
+
+from typing import Any
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+
+from src.utils import retry
+from src.utils.retry import retry_transient
+
+
+def _status_error(status_code: int) -> httpx.HTTPStatusError:
+    """Create the error httpx raises for a response with status_code."""
+    request = httpx.Request("POST", "https://example.test/fhir")
+    response = httpx.Response(status_code, request=request)
+    return httpx.HTTPStatusError(
+        f"HTTP {status_code}", request=request, response=response
+    )
+
+
+@pytest.fixture(autouse=True)
+def sleep(monkeypatch: pytest.MonkeyPatch) -> AsyncMock:
+    """Record backoff delays instead of sleeping."""
+    mock_sleep = AsyncMock()
+    monkeypatch.setattr(retry.asyncio, "sleep", mock_sleep)
+    monkeypatch.setattr(retry.random, "uniform", lambda a, b: 0.0)
+    return mock_sleep
+
+
+class TestRetryTransient:
+    """Tests for retry_transient."""
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize(
+        "error",
+        [
+            _status_error(429),
+            _status_error(503),
+            httpx.ConnectError("Connection refused"),
+            httpx.ConnectTimeout("Timed out connecting"),
+        ],
+    )
+    async def test_retries_transient_errors(
+        self, error: Exception, sleep: AsyncMock
+    ) -> None:
+        """Test that a transient failure is retried until the call succeeds."""
+        call = AsyncMock(side_effect=[error, "ok"])
+
+        assert await retry_transient(call) == "ok"
+        assert call.await_count == 2
+        sleep.assert_awaited_once_with(0.25)
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("status_code", [400, 401, 404, 409, 422, 500, 504])
+    async def test_does_not_retry_other_statuses(
+        self, status_code: int, sleep: AsyncMock
+    ) -> None:
+        """Test that other error statuses are raised immediately."""
+        call = AsyncMock(side_effect=_status_error(status_code))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await retry_transient(call)
+
+        call.assert_awaited_once()
+        sleep.assert_not_awaited()
+
+    @pytest.mark.anyio
+    async def test_does_not_retry_read_timeout(self, sleep: AsyncMock) -> None:
+        """Test that a timeout after the request was sent is not retried."""
+        call = AsyncMock(side_effect=httpx.ReadTimeout("Timed out reading"))
+
+        with pytest.raises(httpx.ReadTimeout):
+            await retry_transient(call)
+
+        call.assert_awaited_once()
+
+    @pytest.mark.anyio
+    async def test_stops_after_attempts(self, sleep: AsyncMock) -> None:
+        """Test that the last error is raised once attempts are exhausted."""
+        errors: list[Any] = [_status_error(503) for _ in range(4)]
+        call = AsyncMock(side_effect=errors)
+
+        with pytest.raises(httpx.HTTPStatusError) as exc_info:
+            await retry_transient(call, attempts=4)
+
+        assert exc_info.value is errors[-1]
+        assert call.await_count == 4
+        assert sleep.await_count == 3
+
+    @pytest.mark.anyio
+    async def test_delay_capped_at_max_delay(self, sleep: AsyncMock) -> None:
+        """Test that the backoff doubles per attempt up to max_delay."""
+        call = AsyncMock(side_effect=[_status_error(429)] * 5 + ["ok"])
+
+        assert (
+            await retry_transient(call, attempts=6, base_delay=1.0, max_delay=5.0)
+            == "ok"
+        )
+        assert [c.args[0] for c in sleep.await_args_list] == [1.0, 2.0, 4.0, 5.0, 5.0]